@@ -12,20 +12,56 @@ def create_app():
     BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
     LOGS_DIR = os.path.join(BACKEND_DIR, "logs")
     CONFIG_DIR = os.path.join(BACKEND_DIR, "config")
+    DATA_DIR = os.path.join(BACKEND_DIR, "data")
 
     # Ensure required directories exist
     Path(LOGS_DIR).mkdir(exist_ok=True)
     Path(CONFIG_DIR).mkdir(exist_ok=True)
+    Path(DATA_DIR).mkdir(exist_ok=True)
 
     # Load configuration with absolute paths
     app.config.from_mapping(
         SECRET_KEY=os.environ.get("SECRET_KEY", "dev"),
         ACCOUNTS_CONFIG_PATH=os.path.join(CONFIG_DIR, "accounts_config.json"),
+        ACCOUNTS_SAVE_DEBOUNCE=0.5,
+        CONFIG_WATCH_INTERVAL=1.0,
+        TICKER_RECONNECT_MAX_TRIES=10,
+        TICKER_RECONNECT_MAX_DELAY=30,
+        TICKER_RESTART_BASE_DELAY=1.0,
+        TICKER_RESTART_MAX_DELAY=60.0,
+        TICKER_DISPATCH_WORKERS=4,
+        TICKER_DISPATCH_QUEUE_SIZE=1000,
         ALLOWED_ORDER_TYPES_PATH=os.path.join(CONFIG_DIR, "allowed_order_types.json"),
         TAGS_PATH=os.path.join(CONFIG_DIR, "tags.json"),
         GOOGLE_SHEETS_CREDENTIALS=os.path.join(CONFIG_DIR, "heroic-muse-377907-482b72703bd0.json"),
         LOG_FILE=os.path.join(LOGS_DIR, "app.log"),
-        INIT_TRACKER_PATH=os.path.join(CONFIG_DIR, "init_tracker.json")
+        # "json" writes one JSON object per line instead of "timestamp - level - message"
+        LOG_FORMAT=os.environ.get("LOG_FORMAT", "text"),
+        LOG_ASYNC=True,
+        LOG_QUEUE_SIZE=10000,
+        LOG_OVERFLOW_POLICY="drop_newest",
+        INIT_TRACKER_PATH=os.path.join(CONFIG_DIR, "init_tracker.json"),
+        TRADE_JOURNAL_PATH=os.path.join(DATA_DIR, "trade_journal.db"),
+        # Follower orders are only sent to the broker when this is turned off
+        REPLICATION_DRY_RUN=os.environ.get("REPLICATION_DRY_RUN", "1") != "0",
+        REPLICATION_MAX_WORKERS=16,
+        REPLICATION_ACCOUNT_TIMEOUT=5.0,
+        REPLICATION_MAX_RETRIES=2,
+        REPLICATION_RETRY_BACKOFF=0.25,
+        DASHBOARD_FETCH_DEADLINE=3.0,
+        ORDER_BOOK_TTL=30.0,
+        # Oldest order book served when a fresh snapshot cannot be fetched
+        ORDER_BOOK_MAX_STALE=300.0,
+        # Kite allows 10 order placements and 10 other calls per second per API key
+        KITE_ORDER_RATE_LIMIT=10,
+        KITE_READ_RATE_LIMIT=10,
+        KITE_ORDER_WAIT=5.0,
+        KITE_READ_WAIT=1.0,
+        EXPORT_FLUSH_INTERVAL_MS=500,
+        EXPORT_BATCH_ROWS=500,
+        TAGS_REFRESH_TTL=300,
+        # Threads serving Flask requests in ASGI mode (python run.py --asgi)
+        ASGI_WSGI_WORKERS=32
     )
 
     with app.app_context():
@@ -35,10 +71,11 @@ def create_app():
         log_info("Logger initialized")
 
         # Register blueprints
-        from .routes import accounts, trades, logs
+        from .routes import accounts, trades, logs, metrics
         app.register_blueprint(accounts.bp)
         app.register_blueprint(trades.bp)
         app.register_blueprint(logs.bp)
+        app.register_blueprint(metrics.bp)
 
         log_info("Routes registered")
 
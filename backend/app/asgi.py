@@ -0,0 +1,148 @@
+"""ASGI entry point for serving many long-lived SSE clients.
+
+The two SSE feeds (/api/trades/stream and /api/logs/stream) run as
+coroutines on the event loop. An idle subscriber is a small mailbox and a
+suspended coroutine; no thread is held. Every other request goes to the
+Flask app on a bounded worker pool, so REST routes stay responsive however
+many dashboards are open.
+
+    uvicorn --factory app.asgi:create_asgi_app --port 5000   # or: python run.py --asgi
+"""
+import asyncio
+import os
+from urllib.parse import parse_qs
+from a2wsgi import WSGIMiddleware
+from .utils.logger import log_info, log_error
+
+KEEP_ALIVE_SECONDS = 15
+
+SSE_HEADERS = [
+    (b'content-type', b'text/event-stream'),
+    (b'cache-control', b'no-cache'),
+    (b'x-accel-buffering', b'no'),
+    (b'access-control-allow-origin', b'*'),
+    (b'access-control-allow-headers', b'Content-Type')
+]
+
+class StreamingApp:
+    """Serve the SSE feeds natively and hand all other requests to Flask."""
+
+    def __init__(self, flask_app, wsgi_workers=None):
+        self.flask_app = flask_app
+        self.wsgi = WSGIMiddleware(flask_app, workers=wsgi_workers or flask_app.config.get('ASGI_WSGI_WORKERS', 32))
+        self.streams = {
+            '/api/trades/stream': self._trades_stream,
+            '/api/logs/stream': self._logs_stream
+        }
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self._lifespan(receive, send)
+            return
+        handler = self.streams.get(scope.get('path', '').rstrip('/'))
+        if scope['type'] == 'http' and scope['method'] == 'GET' and handler:
+            await handler(scope, receive, send)
+            return
+        await self.wsgi(scope, receive, send)
+
+    async def _trades_stream(self, scope, receive, send):
+        from .extensions import trade_bus
+        from .routes.trades import trade_event
+
+        last_event_id = _header(scope, b'last-event-id') or _query(scope, 'last_event_id')
+        try:
+            last_event_id = int(last_event_id) if last_event_id else None
+        except ValueError:
+            last_event_id = None
+        subscription, missed = trade_bus.subscribe(last_event_id)
+        await self._stream(receive, send, subscription, trade_event, missed, trade_bus.unsubscribe)
+
+    async def _logs_stream(self, scope, receive, send):
+        from .routes.logs import log_tailer, log_event
+
+        log_file = self.flask_app.config['LOG_FILE']
+        if not os.path.exists(log_file):
+            log_error(f"Log file not found: {log_file}")
+            await _respond(send, 404, b'{"error": "Log file not found"}', b'application/json')
+            return
+        with self.flask_app.app_context():
+            subscription = log_tailer.subscribe()
+        await self._stream(receive, send, subscription, log_event, (), log_tailer.unsubscribe)
+
+    async def _stream(self, receive, send, subscription, format_event, backlog, unsubscribe):
+        """Send backlog, then every item published to subscription, until the client goes away."""
+        loop = asyncio.get_running_loop()
+        wake = asyncio.Event()
+
+        def wake_up():
+            # Runs on the publisher's thread; must never raise into it
+            try:
+                loop.call_soon_threadsafe(wake.set)
+            except RuntimeError:
+                pass
+
+        subscription.set_waker(wake_up)
+        disconnected = asyncio.ensure_future(_wait_for_disconnect(receive))
+        try:
+            await send({'type': 'http.response.start', 'status': 200, 'headers': SSE_HEADERS})
+            for item in backlog:
+                await _send_chunk(send, format_event(item))
+            while not disconnected.done():
+                # Clear before reading so a put between the read and the wait still wakes us
+                wake.clear()
+                item = subscription.get_nowait()
+                if item is not None:
+                    await _send_chunk(send, format_event(item))
+                    continue
+                waiter = asyncio.ensure_future(wake.wait())
+                done, _ = await asyncio.wait(
+                    {waiter, disconnected}, timeout=KEEP_ALIVE_SECONDS, return_when=asyncio.FIRST_COMPLETED
+                )
+                waiter.cancel()
+                if not done:
+                    await _send_chunk(send, ": keep-alive\n\n")
+        except OSError:
+            # Client went away mid-write
+            pass
+        finally:
+            subscription.set_waker(None)
+            unsubscribe(subscription)
+            disconnected.cancel()
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                log_info("ASGI server started")
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+def create_asgi_app(flask_app=None):
+    """Build the ASGI app around flask_app, creating the Flask app if none is given."""
+    if flask_app is None:
+        from . import create_app
+        flask_app = create_app()
+    return StreamingApp(flask_app)
+
+async def _wait_for_disconnect(receive):
+    while (await receive())['type'] != 'http.disconnect':
+        pass
+
+async def _send_chunk(send, text):
+    await send({'type': 'http.response.body', 'body': text.encode('utf-8'), 'more_body': True})
+
+async def _respond(send, status, body, content_type):
+    await send({'type': 'http.response.start', 'status': status, 'headers': [(b'content-type', content_type)]})
+    await send({'type': 'http.response.body', 'body': body})
+
+def _header(scope, name):
+    for key, value in scope.get('headers', ()):
+        if key == name:
+            return value.decode('latin-1')
+    return None
+
+def _query(scope, name):
+    values = parse_qs(scope.get('query_string', b'').decode('latin-1')).get(name)
+    return values[0] if values else None
@@ -0,0 +1,22 @@
+"""Application-scoped services shared by every blueprint.
+
+Blueprints import these instead of constructing their own, so there is one
+account registry, one set of tickers and one daily token reset per process.
+"""
+from .services.kite_service import KiteService
+from .services.trade_copier import TradeCopier
+from .services.sheets_service import SheetsService
+from .services.trade_bus import TradeBus
+from .services.trade_store import TradeStore
+from .services.trade_journal import TradeJournal
+from .utils.config_watcher import ConfigWatcher
+
+# Picks up edits to accounts_config.json and allowed_order_types.json without a restart
+config_watcher = ConfigWatcher()
+trade_journal = TradeJournal()
+kite_service = KiteService(trade_journal, config_watcher)
+# Recent trades live in a bounded in-memory ring buffer
+trade_store = TradeStore()
+trade_bus = TradeBus(trade_store)
+trade_copier = TradeCopier(kite_service, trade_bus, trade_journal, config_watcher)
+sheets_service = SheetsService()
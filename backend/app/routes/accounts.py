@@ -1,9 +1,8 @@
 from flask import Blueprint, jsonify, request, current_app
-from ..services.kite_service import KiteService
+from ..extensions import kite_service
 from ..utils.logger import log_info, log_error, log_success
 
 bp = Blueprint('accounts', __name__, url_prefix='/api/accounts')
-kite_service = KiteService()
 
 @bp.route('/', methods=['GET'])
 def get_accounts():
@@ -36,6 +35,7 @@ def connect_account(account_id):
 def update_account(account_id):
     """Update account details."""
     try:
+        kite_service._ensure_initialized()
         account = kite_service.accounts.get(account_id)
         if not account:
             return jsonify({"error": "Account not found"}), 404
@@ -1,10 +1,16 @@
-from flask import Blueprint, Response, current_app
-from ..utils.logger import log_info, log_error, log_success
+from flask import Blueprint, Response, current_app, request
+from ..utils.logger import log_info, log_error, log_success, log_index
+from ..utils.log_reader import read_log_tail, parse_log_lines
+from ..utils.log_tailer import LogTailer
 import json
-import time
 import os
 
 bp = Blueprint('logs', __name__, url_prefix='/api/logs')
+log_tailer = LogTailer()
+
+def log_event(log_entry):
+    """Format a parsed log entry as an SSE frame."""
+    return f"data: {json.dumps(log_entry)}\n\n"
 
 @bp.route('/stream', methods=['GET'])
 def stream_logs():
@@ -19,36 +25,17 @@ def stream_logs():
             status=404
         )
 
+    # All clients share one tailer thread; each gets its own bounded mailbox
+    subscription = log_tailer.subscribe()
+
     def generate():
-        try:
-            # Get initial file size
-            file_size = os.path.getsize(log_file)
-            with open(log_file, 'r') as f:
-                # Skip to end of file
-                f.seek(file_size)
-                
-                while True:
-                    line = f.readline()
-                    if line:
-                        # Parse log line
-                        try:
-                            timestamp, level, message = line.strip().split(' - ', 2)
-                            log_entry = {
-                                'timestamp': timestamp,
-                                'level': level,
-                                'message': message
-                            }
-                            yield f"data: {json.dumps(log_entry)}\n\n"
-                        except Exception as e:
-                            log_error(f"Failed to parse log line: {str(e)}")
-                            # Skip malformed log lines
-                            continue
-                    else:
-                        # No new lines, wait before checking again
-                        time.sleep(0.1)
-        except Exception as e:
-            log_error(f"Error streaming logs: {str(e)}")
-            yield f"data: {json.dumps({'error': str(e)})}\n\n"
+        while True:
+            log_entry = subscription.get(timeout=15)
+            if log_entry is None:
+                # Keep-alive; also lets us notice a closed connection
+                yield ": keep-alive\n\n"
+                continue
+            yield log_event(log_entry)
 
     # Set headers for SSE with CORS
     headers = {
@@ -60,16 +47,38 @@ def stream_logs():
         'Access-Control-Allow-Headers': 'Content-Type'
     }
 
-    return Response(
+    response = Response(
         generate(),
         mimetype='text/event-stream',
         headers=headers
     )
+    response.call_on_close(lambda: log_tailer.unsubscribe(subscription))
+    return response
+
+def bad_request(error):
+    return Response(json.dumps({'error': error}), mimetype='application/json', status=400)
 
 @bp.route('/history', methods=['GET'])
 def get_log_history():
-    """Get recent log history."""
+    """
+    Get recent log history, newest page first.
+    - `lines` sets the page size (default 100, 1 to 1000).
+    - `before` is the `next_before` cursor of the previous page; paging continues into rotated backups.
+    - `level` and/or `source` (e.g. "KiteService") are answered from the in-memory index of recent records.
+    """
     try:
+        try:
+            line_count = max(1, min(int(request.args.get('lines', 100)), 1000))
+        except ValueError:
+            return bad_request("lines must be an integer")
+        level = request.args.get('level')
+        source = request.args.get('source')
+        if level or source:
+            return Response(
+                json.dumps({'logs': log_index.query(level, source, line_count)}),
+                mimetype='application/json'
+            )
+
         log_file = current_app.config['LOG_FILE']
         if not os.path.exists(log_file):
             log_error("Log file not found")
@@ -82,9 +91,11 @@ def get_log_history():
                 status=404
             )
 
-        file_size = os.path.getsize(log_file)
-        if file_size == 0:
-            log_info("Empty log file found")
+        try:
+            lines, next_before = read_log_tail(log_file, line_count, request.args.get('before'))
+        except ValueError:
+            return bad_request("before must be a next_before cursor from a previous page")
+        if not lines:
             return Response(
                 json.dumps({
                     'logs': [],
@@ -93,34 +104,20 @@ def get_log_history():
                 mimetype='application/json'
             )
 
-        # Read last 100 lines of logs
-        logs = []
-        with open(log_file, 'r') as f:
-            # Read all lines and get last 100
-            lines = f.readlines()[-100:]
-            for line in lines:
-                try:
-                    timestamp, level, message = line.strip().split(' - ', 2)
-                    logs.append({
-                        'timestamp': timestamp,
-                        'level': level,
-                        'message': message
-                    })
-                except Exception as e:
-                    log_error(f"Failed to parse log line: {str(e)}")
-                    continue
+        logs = parse_log_lines(lines)
 
         if not logs:
             return Response(
                 json.dumps({
                     'logs': [],
-                    'message': 'No valid logs found. New logs will appear automatically.'
+                    'message': 'No valid logs found. New logs will appear automatically.',
+                    'next_before': next_before
                 }),
                 mimetype='application/json'
             )
 
         return Response(
-            json.dumps({'logs': logs}),
+            json.dumps({'logs': logs, 'next_before': next_before}),
             mimetype='application/json'
         )
     except Exception as e:
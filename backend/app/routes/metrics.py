@@ -0,0 +1,20 @@
+from flask import Blueprint, Response, jsonify
+from ..utils.metrics import metrics
+from ..utils.logger import log_error
+
+bp = Blueprint('metrics', __name__, url_prefix='/api/metrics')
+
+@bp.route('', methods=['GET'])
+@bp.route('/', methods=['GET'])
+def prometheus_metrics():
+    """Expose latency histograms and counters in the Prometheus text format."""
+    return Response(metrics.to_prometheus(), mimetype='text/plain; version=0.0.4')
+
+@bp.route('/summary', methods=['GET'])
+def metrics_summary():
+    """JSON summary (count, p50/p90/p99/p999 and max in ms) for the dashboard."""
+    try:
+        return jsonify(metrics.summary())
+    except Exception as e:
+        log_error(f"[Metrics API] Error building summary: {str(e)}")
+        return jsonify({"error": str(e)}), 500
@@ -1,65 +1,95 @@
 from flask import Blueprint, jsonify, request, current_app, Response
-from ..services.kite_service import KiteService
-from ..services.trade_copier import TradeCopier
-from ..services.sheets_service import SheetsService
+from ..extensions import trade_journal, kite_service, trade_store, trade_bus, trade_copier, sheets_service
 from ..utils.logger import log_info, log_error, log_success
 import json
-import time
 from datetime import datetime
 
 bp = Blueprint('trades', __name__, url_prefix='/api/trades')
-kite_service = KiteService()
-trade_copier = TradeCopier(kite_service)
-sheets_service = SheetsService()
-
-# Store trades in memory (in a real app, use a database)
-trades = []
 
 @bp.route('/', methods=['GET'])
 def get_trades():
-    """Get all trades."""
+    """Get recent trades, optionally only those after sequence `since`."""
     try:
-        return jsonify(trades)
+        since = int(request.args.get('since', 0))
+        limit = request.args.get('limit')
+        limit = int(limit) if limit else None
+        return Response(trade_store.to_json(since, limit), mimetype='application/json')
     except Exception as e:
         log_error(f"Error getting trades: {str(e)}")
         return jsonify({"error": str(e)}), 500
 
+def trade_event(record):
+    """Format a TradeRecord as an SSE frame; the record's sequence number is the event id."""
+    return f"id: {record.seq}\ndata: {json.dumps({'type': 'live_trade', 'trades': [record.to_dict()]})}\n\n"
+
 @bp.route('/stream', methods=['GET'])
 def stream_trades():
-    """Stream trades via SSE."""
+    """Stream trades via SSE, resuming after Last-Event-ID when the client reconnects."""
+    last_event_id = request.headers.get('Last-Event-ID', request.args.get('last_event_id'))
+    try:
+        last_event_id = int(last_event_id) if last_event_id else None
+    except ValueError:
+        last_event_id = None
+
     def generate():
-        while True:
-            # Get new trades
-            new_trades = [trade for trade in trades if trade.get('timestamp', 0) > time.time() - 1]
-            if new_trades:
-                yield f"data: {json.dumps({'type': 'live_trade', 'trades': new_trades})}\n\n"
-            time.sleep(1)
+        subscription, missed = trade_bus.subscribe(last_event_id)
+        try:
+            for record in missed:
+                yield trade_event(record)
+            while True:
+                record = subscription.get(timeout=15)
+                if record is None:
+                    # Keep-alive; also lets us notice a closed connection
+                    yield ": keep-alive\n\n"
+                    continue
+                yield trade_event(record)
+        finally:
+            trade_bus.unsubscribe(subscription)
 
     return Response(generate(), mimetype='text/event-stream')
 
 @bp.route('/history', methods=['GET'])
 def get_trade_history():
-    """Get trade history for an account using Kite API."""
+    """
+    Get trade history for an account from the trade journal, newest first, using a cursor.
+    - `after_ts`/`after_id` come from `next_cursor` of the previous page.
+    - `symbol`, `product_type` and `order_type` filter on the server.
+    - `refresh=1` first syncs the broker's order book (cached for ORDER_BOOK_TTL) into the journal.
+    - `limit` is the page size (default 50, 1 to 500); `total` is only counted for the first page.
+    """
     try:
         account_id = request.args.get('account_id')
-        page = int(request.args.get('page', 1))
-        limit = int(request.args.get('limit', 50))
+        try:
+            limit = max(1, min(int(request.args.get('limit', 50)), 500))
+        except ValueError:
+            return jsonify({"error": "limit must be an integer"}), 400
+        after_ts = request.args.get('after_ts')
+        after_id = request.args.get('after_id')
         if not account_id:
             log_error("[Trades API] Account ID is required for trade history.")
             return jsonify({"error": "Account ID is required"}), 400
-        trades = kite_service.get_trades_for_account(account_id)
-        # Sort by timestamp (newest first)
-        trades.sort(key=lambda x: x.get('timestamp', 0), reverse=True)
-        # Paginate
-        start_idx = (page - 1) * limit
-        end_idx = start_idx + limit
-        paginated_trades = trades[start_idx:end_idx]
-        log_info(f"[Trades API] Returning {len(paginated_trades)} trades for account {account_id} (page {page})")
-        return jsonify({
-            'trades': paginated_trades,
-            'has_more': end_idx < len(trades),
-            'total': len(trades)
-        })
+        if request.args.get('refresh') == '1':
+            kite_service.sync_trade_history(account_id)
+        account_trades, next_cursor = trade_journal.trades_page(
+            account_id,
+            limit,
+            after=(after_ts, after_id) if after_ts and after_id else None,
+            filters={
+                'symbol': request.args.get('symbol'),
+                'product_type': request.args.get('product_type'),
+                'order_type': request.args.get('order_type')
+            }
+        )
+        log_info(f"[Trades API] Returning {len(account_trades)} trades for account {account_id}")
+        page = {
+            'trades': account_trades,
+            'has_more': next_cursor is not None,
+            'next_cursor': next_cursor
+        }
+        # Counting is O(total); later pages stay O(limit)
+        if not (after_ts and after_id):
+            page['total'] = trade_journal.count_trades(account_id)
+        return jsonify(page)
     except Exception as e:
         log_error(f"[Trades API] Error getting trade history: {str(e)}")
         return jsonify({"error": str(e)}), 500
@@ -96,19 +126,27 @@ def stop_replication():
         log_error(f"Error stopping trade replication: {str(e)}")
         return jsonify({"error": str(e)}), 500
 
+@bp.route('/replicate/status', methods=['GET'])
+def replication_status():
+    """Report whether replication is on and the connection health of each ticker."""
+    try:
+        return jsonify({
+            'replicating': trade_copier.is_replicating,
+            'tickers': kite_service.ticker_status()
+        })
+    except Exception as e:
+        log_error(f"Error getting replication status: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
 @bp.route('/export', methods=['POST'])
 def export_trades():
-    """Export selected trades to Google Sheets by trade ID (fetching from Kite API)."""
+    """Export selected trades to Google Sheets by trade ID (looked up in the trade journal)."""
     try:
         log_info("[Export API] Export request received")
-        log_info(f"[Export API] Request headers: {dict(request.headers)}")
-        log_info(f"[Export API] Request data (raw): {request.data}")
 
         # Check content type to handle both JSON and form data
         if request.is_json:
-            log_info("[Export API] Processing JSON request")
             data = request.json
-            log_info(f"[Export API] Parsed JSON: {data}")
             trade_ids = data.get('trade_ids', [])
             tag = data.get('tag')
             account_id = data.get('account_id')
@@ -156,7 +194,6 @@ def export_trades():
             log_info("[Export API] No account ID provided, attempting to find from trade data")
             # Try to get account ID from the first trade if available
             all_accounts = kite_service.get_active_accounts()
-            log_info(f"[Export API] Active accounts: {all_accounts}")
             if all_accounts:
                 account_id = all_accounts[0]['account_id']
                 log_info(f"[Export API] Using first active account: {account_id}")
@@ -171,30 +208,25 @@ def export_trades():
         else:
             log_error(f"[Export API] Account {account_id} is not active or not found")
 
-        # Fetch all trades for the account
-        log_info(f"[Export API] Fetching trades for account {account_id}")
-        all_trades = kite_service.get_trades_for_account(account_id)
-        log_info(f"[Export API] Found {len(all_trades)} total trades for account {account_id}")
-        if len(all_trades) > 0:
-            log_info(f"[Export API] Sample trade: {all_trades[0]}")
-
-        # Filter for selected trades
-        selected_trades = [trade for trade in all_trades if trade['trade_id'] in trade_ids]
+        # Look up the selected trades in the journal
+        selected_trades = trade_journal.get_trades(account_id, trade_ids)
         log_info(f"[Export API] Selected {len(selected_trades)} trades for export")
-        if selected_trades:
-            log_info(f"[Export API] Selected trade IDs: {[t['trade_id'] for t in selected_trades]}")
 
         if not selected_trades:
             log_error(f"[Export API] No trades found for selected IDs: {trade_ids}")
             return jsonify({"error": "No matching trades found for export."}), 400
 
         # Export to Google Sheets
-        log_info(f"[Export API] Exporting {len(selected_trades)} trades to Google Sheets with tag: {tag}")
-        export_result = sheets_service.export_trades(selected_trades, tag)
-        log_info(f"[Export API] sheets_service.export_trades result: {export_result}")
-        if export_result:
-            log_success(f"[Export API] Successfully exported {len(selected_trades)} trades for account {account_id}")
-            return jsonify({"message": f"Successfully exported {len(selected_trades)} trades"})
+        log_info(f"[Export API] Queueing {len(selected_trades)} trades for Google Sheets with tag: {tag}")
+        job_id = sheets_service.export_trades(selected_trades, tag)
+        if job_id:
+            log_success(f"[Export API] Queued {len(selected_trades)} trades for account {account_id} as job {job_id}")
+            return jsonify({
+                "success": True,
+                "message": f"Export of {len(selected_trades)} trades queued",
+                "job_id": job_id,
+                "status": "queued"
+            }), 202
         else:
             log_error(f"[Export API] Failed to export trades for account {account_id}")
             return jsonify({"error": "Failed to export trades"}), 500
@@ -202,6 +234,18 @@ def export_trades():
         log_error(f"[Export API] Error exporting trades: {str(e)}")
         return jsonify({"error": str(e)}), 500
 
+@bp.route('/export/<job_id>', methods=['GET'])
+def get_export_status(job_id):
+    """Get the status of a queued export job."""
+    try:
+        job = sheets_service.get_export_status(job_id)
+        if not job:
+            return jsonify({"error": "Export job not found"}), 404
+        return jsonify(job)
+    except Exception as e:
+        log_error(f"[Export API] Error getting export status for {job_id}: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
 @bp.route('/tags', methods=['GET'])
 def get_tags():
     """Get all tags."""
@@ -217,10 +261,12 @@ def dashboard_overview():
     """Return dashboard overview stats: active accounts and trades executed per account."""
     try:
         active_accounts = kite_service.get_active_accounts()
+        # Counted from each account's broker order book, so trades placed outside the app count too
         trades_executed = kite_service.get_trades_executed_counts()
         return jsonify({
             'active_accounts': len(active_accounts),
-            'trades_executed': trades_executed
+            'trades_executed': trades_executed,
+            'partial': any(entry['stale'] for entry in trades_executed)
         })
     except Exception as e:
         log_error(f"[Dashboard API] Error getting overview: {str(e)}")
@@ -0,0 +1,70 @@
+from collections import namedtuple
+from types import MappingProxyType
+import threading
+
+# One immutable view of the registry: readers take it once and use it throughout
+AccountsSnapshot = namedtuple('AccountsSnapshot', ['version', 'accounts'])
+
+class AccountRegistry:
+    """Copy-on-write registry of account configs shared by every blueprint.
+
+    Writers serialize on a lock, copy the changed account dicts and swap in
+    a new read-only snapshot; readers just take the current snapshot, so
+    the order-update path never blocks and never sees a half-applied change.
+    Account dicts inside a snapshot must not be mutated.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._snapshot = AccountsSnapshot(0, MappingProxyType({}))
+
+    def snapshot(self):
+        """Return the current (version, accounts) snapshot."""
+        return self._snapshot
+
+    @property
+    def accounts(self):
+        return self._snapshot.accounts
+
+    @property
+    def version(self):
+        return self._snapshot.version
+
+    def replace(self, accounts, keep=()):
+        """
+        Replace every account with the given list of account dicts.
+        - Fields named in `keep` retain their current non-empty values for accounts that already exist.
+        """
+        with self._lock:
+            current = self._snapshot.accounts
+            replaced = {}
+            for acc in accounts:
+                acc = dict(acc)
+                existing = current.get(acc['account_id'], {})
+                for field in keep:
+                    if existing.get(field):
+                        acc[field] = existing[field]
+                replaced[acc['account_id']] = acc
+            self._publish(replaced)
+
+    def update(self, account_id, **changes):
+        """Apply field changes to one account; returns False if the account is unknown."""
+        with self._lock:
+            current = self._snapshot.accounts
+            if account_id not in current:
+                return False
+            accounts = dict(current)
+            accounts[account_id] = {**current[account_id], **changes}
+            self._publish(accounts)
+            return True
+
+    def update_all(self, **changes):
+        """Apply the same field changes to every account."""
+        with self._lock:
+            self._publish({
+                account_id: {**account, **changes}
+                for account_id, account in self._snapshot.accounts.items()
+            })
+
+    def _publish(self, accounts):
+        self._snapshot = AccountsSnapshot(self._snapshot.version + 1, MappingProxyType(accounts))
@@ -0,0 +1,133 @@
+import atexit
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from ..utils.logger import log_info, log_error
+
+REQUIRED_FIELDS = ('account_id', 'api_key', 'secret_api_key')
+
+def validate_accounts(accounts):
+    """Raise ValueError unless accounts is a list of account dicts with unique ids and one primary at most."""
+    if not isinstance(accounts, list):
+        raise ValueError("accounts config must be a list")
+    seen = set()
+    for account in accounts:
+        if not isinstance(account, dict):
+            raise ValueError("each account must be an object")
+        missing = [field for field in REQUIRED_FIELDS if not account.get(field)]
+        if missing:
+            raise ValueError(f"account is missing {', '.join(missing)}")
+        if account['account_id'] in seen:
+            raise ValueError(f"duplicate account_id {account['account_id']}")
+        seen.add(account['account_id'])
+        if not isinstance(account.get('ps_multiplier', 1.0), (int, float)):
+            raise ValueError(f"ps_multiplier of {account['account_id']} must be a number")
+    if sum(1 for account in accounts if account.get('primary')) > 1:
+        raise ValueError("more than one primary account")
+
+class AccountsStore:
+    """Atomic, debounced persistence for accounts_config.json.
+
+    Writes go to a temp file in the same directory that is then renamed over
+    the original, so readers only ever see a complete file. Saves requested
+    within `debounce` seconds of each other are coalesced into one write, and
+    a write is skipped when the content hash matches what is already on disk.
+    """
+
+    def __init__(self, path, snapshot, debounce=0.5):
+        self.path = path
+        self._snapshot = snapshot
+        self.debounce = debounce
+        self._content_hash = None
+        self._dirty = False
+        self._timer = None
+        self._lock = threading.Lock()
+        atexit.register(self.flush)
+
+    def load(self):
+        """Read the accounts list from disk and remember its content hash."""
+        with open(self.path, 'r') as f:
+            accounts = json.load(f)
+        validate_accounts(accounts)
+        self._content_hash = self._hash(self._serialize(accounts))
+        return accounts
+
+    def reload(self):
+        """
+        Re-read the file after it changed on disk.
+        - Returns the validated accounts list, or None when the content is what we last loaded or wrote.
+        - Raises if the file is unreadable or invalid, leaving the remembered hash untouched.
+        """
+        with open(self.path, 'r') as f:
+            content = f.read()
+        content_hash = self._hash(content)
+        with self._lock:
+            if content_hash == self._content_hash:
+                return None
+        accounts = json.loads(content)
+        validate_accounts(accounts)
+        with self._lock:
+            self._content_hash = self._hash(self._serialize(accounts))
+        return accounts
+
+    def save(self):
+        """Schedule a write; a burst of saves becomes a single write of the latest state."""
+        with self._lock:
+            self._dirty = True
+            if self._timer is None:
+                self._timer = threading.Timer(self.debounce, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+    @property
+    def pending(self):
+        """True while a requested save has not reached the file, e.g. because the last write failed."""
+        return self._dirty
+
+    def flush(self):
+        """Write any pending change now."""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            # Never write state nobody asked to save, e.g. the empty list left by a failed load
+            if not self._dirty:
+                return False
+            content = self._serialize(self._snapshot())
+            content_hash = self._hash(content)
+            if content_hash == self._content_hash:
+                self._dirty = False
+                return False
+            try:
+                self._write_atomic(content)
+                self._content_hash = content_hash
+                self._dirty = False
+                log_info("[KiteService] Accounts saved to config file")
+                return True
+            except Exception as e:
+                log_error(f"[KiteService] Error saving accounts: {str(e)}")
+                return False
+
+    def _write_atomic(self, content):
+        directory = os.path.dirname(self.path) or '.'
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.accounts_config.', suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w') as f:
+                f.write(content)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    @staticmethod
+    def _serialize(accounts):
+        return json.dumps(accounts, indent=2)
+
+    @staticmethod
+    def _hash(content):
+        return hashlib.sha256(content.encode('utf-8')).hexdigest()
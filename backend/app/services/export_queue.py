@@ -0,0 +1,123 @@
+from collections import OrderedDict
+from datetime import datetime
+import threading
+import time
+import uuid
+from ..utils.logger import log_warning, log_error
+
+class ExportQueue:
+    """Background writer that coalesces trade exports into few sheet writes.
+
+    Pending exports are merged into one batch and written when the batch
+    reaches `max_batch_rows` or the oldest export has waited
+    `flush_interval` seconds. Writes that fail with a retryable error
+    (quota, server errors) are retried with exponential backoff.
+    """
+
+    def __init__(self, write_rows, is_retryable, flush_interval=0.5, max_batch_rows=500,
+                 max_retries=5, retry_backoff=1.0, job_retention=1000):
+        self._write_rows = write_rows
+        self._is_retryable = is_retryable
+        self.flush_interval = flush_interval
+        self.max_batch_rows = max_batch_rows
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.job_retention = job_retention
+        self._pending = []
+        self._jobs = OrderedDict()
+        self._ready = threading.Condition()
+        self._thread = threading.Thread(target=self._run, name='sheets-export', daemon=True)
+        self._thread.start()
+
+    def submit(self, rows):
+        """Queue rows for export and return a job id to poll with status()."""
+        job_id = uuid.uuid4().hex
+        with self._ready:
+            self._jobs[job_id] = {
+                'job_id': job_id,
+                'status': 'queued',
+                'rows': len(rows),
+                'attempts': 0,
+                'error': None,
+                'submitted_at': datetime.now().isoformat(),
+                'completed_at': None
+            }
+            self._pending.append((job_id, rows, time.monotonic()))
+            self._trim_jobs()
+            self._ready.notify()
+        return job_id
+
+    def status(self, job_id):
+        """Return a copy of the job's status dict, or None if the job is unknown."""
+        with self._ready:
+            job = self._jobs.get(job_id)
+            return dict(job) if job else None
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            job_ids = [job_id for job_id, _ in batch]
+            rows = [row for _, job_rows in batch for row in job_rows]
+            self._write(job_ids, rows)
+
+    def _next_batch(self):
+        """Block until a batch is due, then take whole jobs up to max_batch_rows."""
+        with self._ready:
+            while True:
+                if self._pending:
+                    queued_rows = sum(len(rows) for _, rows, _ in self._pending)
+                    wait = self._pending[0][2] + self.flush_interval - time.monotonic()
+                    if queued_rows >= self.max_batch_rows or wait <= 0:
+                        break
+                    self._ready.wait(wait)
+                else:
+                    self._ready.wait()
+
+            batch = []
+            batch_rows = 0
+            while self._pending:
+                job_rows = self._pending[0][1]
+                if batch and batch_rows + len(job_rows) > self.max_batch_rows:
+                    break
+                job_id, job_rows, _ = self._pending.pop(0)
+                batch.append((job_id, job_rows))
+                batch_rows += len(job_rows)
+            return batch
+
+    def _write(self, job_ids, rows):
+        for attempt in range(1, self.max_retries + 2):
+            self._set_status(job_ids, 'writing', attempts=attempt)
+            try:
+                self._write_rows(rows)
+                self._set_status(job_ids, 'done', completed=True)
+                return
+            except Exception as e:
+                if not self._is_retryable(e) or attempt > self.max_retries:
+                    self._set_status(job_ids, 'failed', error=str(e), completed=True)
+                    log_error(f"[Sheets Export] Failed to write {len(rows)} rows after {attempt} attempt(s): {str(e)}")
+                    return
+                delay = self.retry_backoff * (2 ** (attempt - 1))
+                log_warning(f"[Sheets Export] Write rate-limited, retrying in {delay}s: {str(e)}")
+                time.sleep(delay)
+
+    def _set_status(self, job_ids, status, attempts=None, error=None, completed=False):
+        with self._ready:
+            for job_id in job_ids:
+                job = self._jobs.get(job_id)
+                if not job:
+                    continue
+                job['status'] = status
+                if attempts is not None:
+                    job['attempts'] = attempts
+                if error is not None:
+                    job['error'] = error
+                if completed:
+                    job['completed_at'] = datetime.now().isoformat()
+
+    def _trim_jobs(self):
+        """Forget the oldest finished jobs beyond job_retention."""
+        for job_id in list(self._jobs):
+            if len(self._jobs) <= self.job_retention:
+                break
+            if self._jobs[job_id]['status'] in ('done', 'failed'):
+                del self._jobs[job_id]
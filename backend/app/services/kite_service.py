@@ -1,22 +1,87 @@
 from kiteconnect import KiteConnect, KiteTicker
+from kiteconnect.exceptions import KiteException, NetworkException, DataException
+import requests
+from urllib3.exceptions import NewConnectionError
+from concurrent.futures import ThreadPoolExecutor, wait
 import json
 from flask import current_app
-from ..utils.logger import log_info, log_error, log_success
+from ..utils.logger import log_info, log_warning, log_error, log_success
+from ..utils.metrics import metrics
+from .order_book_cache import OrderBookCache
+from .trade_history import order_to_trade
+from .accounts_store import AccountsStore
+from .account_registry import AccountRegistry
+from .ticker_supervisor import TickerSupervisor
+from .rate_limiter import RateLimiter
+from .order_errors import OrderNotSent, OrderRejected, OrderUncertain
+from contextlib import contextmanager
+import threading
 import time
 import traceback
 from datetime import datetime, date
 
+# HTTPAdapter settings for the per-account session kept by each KiteConnect client
+HTTP_POOL = {
+    'pool_connections': 4,
+    'pool_maxsize': 16,
+    'max_retries': 0,
+    'pool_block': False
+}
+
 class KiteService:
-    def __init__(self):
-        self.accounts = {}
+    def __init__(self, trade_journal=None, config_watcher=None, kite_factory=KiteConnect, ticker_factory=KiteTicker):
+        self.trade_journal = trade_journal
+        self.config_watcher = config_watcher
+        # Swappable so benchmarks can run against a simulated broker
+        self.kite_factory = kite_factory
+        self.ticker_factory = ticker_factory
+        self.registry = AccountRegistry()
         self.tickers = {}
+        self._clients = {}
+        self._clients_lock = threading.Lock()
+        self._gather_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix='kite-gather')
+        self._last_counts = {}
+        self.order_books = OrderBookCache(self._fetch_orders)
+        self.rate_limiter = RateLimiter()
+        self.order_wait = 5.0
+        self.read_wait = 1.0
+        self.accounts_store = None
+        self._init_lock = threading.Lock()
         self._initialized = False
 
+    @property
+    def accounts(self):
+        """Read-only view of the current accounts, keyed by account_id."""
+        return self.registry.accounts
+
     def _ensure_initialized(self):
         """Ensure the service is initialized with app context."""
-        if not self._initialized:
+        if self._initialized:
+            return
+        # Only one request performs the load and the daily token reset
+        with self._init_lock:
+            if self._initialized:
+                return
             with current_app.app_context():
+                self.accounts_store = AccountsStore(
+                    current_app.config['ACCOUNTS_CONFIG_PATH'],
+                    lambda: list(self.accounts.values()),
+                    debounce=current_app.config.get('ACCOUNTS_SAVE_DEBOUNCE', 0.5)
+                )
                 self.load_accounts()
+                if self.trade_journal:
+                    self.trade_journal._ensure_initialized()
+                self.order_books.ttl = current_app.config.get('ORDER_BOOK_TTL', 30.0)
+                self.order_books.max_stale = current_app.config.get('ORDER_BOOK_MAX_STALE', 300.0)
+                self.rate_limiter.rates = {
+                    'order': current_app.config.get('KITE_ORDER_RATE_LIMIT', 10),
+                    'read': current_app.config.get('KITE_READ_RATE_LIMIT', 10)
+                }
+                self.order_wait = current_app.config.get('KITE_ORDER_WAIT', 5.0)
+                self.read_wait = current_app.config.get('KITE_READ_WAIT', 1.0)
+                if self.config_watcher:
+                    self.config_watcher.poll_interval = current_app.config.get('CONFIG_WATCH_INTERVAL', 1.0)
+                    self.config_watcher.watch(current_app.config['ACCOUNTS_CONFIG_PATH'], self.reload_accounts)
                 self._initialized = True
 
     def _check_and_reset_tokens(self):
@@ -40,11 +105,18 @@ class KiteService:
                 log_info("[KiteService] Daily token initialization required")
                 
                 # Reset all access tokens
-                for account in self.accounts.values():
-                    account['access_token'] = ""
+                self.registry.update_all(access_token="")
+                self.drop_kite_instances()
+                # Yesterday's books and counts must not be served as a fallback while no account can fetch
+                self.order_books.drop()
+                self._last_counts = {}
                 
-                # Save accounts with reset tokens
+                # Save accounts with reset tokens now, not after the debounce: the tracker must never
+                # say today's reset is done while the file still holds yesterday's tokens
                 self.save_accounts()
+                self.flush_accounts()
+                if self.accounts_store.pending:
+                    raise RuntimeError("accounts with reset tokens could not be saved; reset will be retried")
                 
                 # Update tracker
                 tracker_data['last_init_date'] = today
@@ -62,8 +134,7 @@ class KiteService:
         """Load accounts from config file and check for token reset."""
         log_info("[KiteService] Loading accounts from config file...")
         try:
-            with open(current_app.config['ACCOUNTS_CONFIG_PATH'], 'r') as f:
-                self.accounts = {acc['account_id']: acc for acc in json.load(f)}
+            self.registry.replace(self.accounts_store.load())
             log_info(f"[KiteService] Accounts loaded: {[a for a in self.accounts.keys()]}")
             
             # Check and reset tokens if needed
@@ -71,17 +142,36 @@ class KiteService:
             
         except Exception as e:
             log_error(f"[KiteService] Error loading accounts: {str(e)}\n{traceback.format_exc()}")
-            self.accounts = {}
+            self.registry.replace([])
+
+    def reload_accounts(self, path=None):
+        """
+        Swap in accounts_config after it was edited on disk, without touching running tickers.
+        - Our own writes are recognised by content hash and ignored.
+        - Session tokens held in memory win over the file; clients and order books are dropped
+          only for accounts whose credentials changed or that were removed.
+        """
+        accounts = self.accounts_store.reload()
+        if accounts is None:
+            return False
+        previous = self.accounts
+        self.registry.replace(accounts, keep=('access_token', 'request_token'))
+        current = self.accounts
+        for account_id, account in previous.items():
+            updated = current.get(account_id)
+            if not updated or any(updated.get(field) != account.get(field) for field in ('api_key', 'access_token')):
+                self.drop_kite_instances(account_id)
+                self.order_books.drop(account_id)
+        log_success(f"[KiteService] Accounts reloaded from config file: {list(current.keys())}")
+        return True
 
     def save_accounts(self):
-        """Save accounts to config file."""
-        log_info("[KiteService] Saving accounts to config file...")
-        try:
-            with open(current_app.config['ACCOUNTS_CONFIG_PATH'], 'w') as f:
-                json.dump(list(self.accounts.values()), f, indent=2)
-            log_info(f"[KiteService] Accounts saved: {[a for a in self.accounts.keys()]}")
-        except Exception as e:
-            log_error(f"[KiteService] Error saving accounts: {str(e)}\n{traceback.format_exc()}")
+        """Save accounts to config file; bursts of saves are coalesced into one atomic write."""
+        self.accounts_store.save()
+
+    def flush_accounts(self):
+        """Write pending account changes to the config file immediately."""
+        self.accounts_store.flush()
 
     def connect_account(self, account_id, request_token):
         """Connect to a Kite account using request token."""
@@ -95,7 +185,7 @@ class KiteService:
 
             log_info(f"[KiteService] Using API key: {account['api_key']} for account: {account_id}")
             log_info(f"[KiteService] Request token received for account {account_id}: {bool(request_token)}")
-            kite = KiteConnect(api_key=account['api_key'])
+            kite = self.kite_factory(api_key=account['api_key'])
             log_info(f"[KiteService] Calling generate_session for account: {account_id}")
             data = kite.generate_session(
                 request_token=request_token,
@@ -103,8 +193,7 @@ class KiteService:
             )
             log_info(f"[KiteService] generate_session successful for account: {account_id}")
             
-            account['access_token'] = data['access_token']
-            account['request_token'] = request_token
+            self.registry.update(account_id, access_token=data['access_token'], request_token=request_token)
             self.save_accounts()
             
             log_success(f"[KiteService] Successfully connected account {account_id}")
@@ -114,68 +203,230 @@ class KiteService:
             return False
 
     def get_kite_instance(self, account_id):
-        """Get KiteConnect instance for an account."""
+        """
+        Get the cached KiteConnect client for an account.
+        - Each client keeps its own pooled keep-alive HTTP session.
+        - The client is rebuilt only when the account's access token changes.
+        """
         self._ensure_initialized()
         account = self.accounts.get(account_id)
         if not account or not account.get('access_token'):
             return None
 
+        access_token = account['access_token']
+        cached = self._clients.get(account_id)
+        if cached and cached[0] == access_token:
+            return cached[1]
+
+        with self._clients_lock:
+            cached = self._clients.get(account_id)
+            if cached and cached[0] == access_token:
+                return cached[1]
+            try:
+                kite = self.kite_factory(api_key=account['api_key'], pool=HTTP_POOL)
+                kite.set_access_token(access_token)
+            except Exception as e:
+                log_error(f"Error creating Kite instance for {account_id}: {str(e)}")
+                return None
+            self._clients[account_id] = (access_token, kite)
+
+        if cached:
+            self._close_client(cached[1])
+        return kite
+
+    def drop_kite_instances(self, account_id=None):
+        """Drop cached KiteConnect clients for one account, or for all accounts."""
+        with self._clients_lock:
+            if account_id is None:
+                dropped = list(self._clients.values())
+                self._clients = {}
+            else:
+                entry = self._clients.pop(account_id, None)
+                dropped = [entry] if entry else []
+        for _, kite in dropped:
+            self._close_client(kite)
+
+    @staticmethod
+    def _close_client(kite):
+        """Close the HTTP session held by a KiteConnect client."""
         try:
-            kite = KiteConnect(api_key=account['api_key'])
-            kite.set_access_token(account['access_token'])
-            return kite
-        except Exception as e:
-            log_error(f"Error creating Kite instance for {account_id}: {str(e)}")
-            return None
+            kite.reqsession.close()
+        except Exception:
+            pass
 
     def start_ticker(self, account_id, on_order_update):
-        """Start KiteTicker for an account."""
+        """
+        Start a supervised KiteTicker for an account.
+        - The supervisor reconnects with jittered backoff and backfills orders missed while disconnected.
+        """
         self._ensure_initialized()
         account = self.accounts.get(account_id)
         if not account or not account.get('access_token'):
             return False
 
         try:
-            kite = self.get_kite_instance(account_id)
-            if not kite:
+            if not self.get_kite_instance(account_id):
                 return False
 
-            ticker = KiteTicker(account['api_key'], account['access_token'])
-            ticker.on_order_update = on_order_update
-            ticker.connect(threaded=True)
-            self.tickers[account_id] = ticker
+            def handle_order_update(data):
+                # Keep the cached order book current, then hand the order on
+                data.setdefault('account_id', account_id)
+                self.order_books.apply_update(account_id, data)
+                on_order_update(data)
+
+            config = current_app.config
+            reconnect_max_tries = config.get('TICKER_RECONNECT_MAX_TRIES', 10)
+            reconnect_max_delay = config.get('TICKER_RECONNECT_MAX_DELAY', 30)
+            supervisor = TickerSupervisor(
+                account_id,
+                lambda: self._make_ticker(account_id, reconnect_max_tries, reconnect_max_delay),
+                # A backfill must not be dropped for lack of a read slot; let it wait out the queue
+                lambda: self._fetch_orders(account_id, wait=self.order_wait),
+                handle_order_update,
+                restart_base_delay=config.get('TICKER_RESTART_BASE_DELAY', 1.0),
+                restart_max_delay=config.get('TICKER_RESTART_MAX_DELAY', 60.0),
+                dispatch_workers=config.get('TICKER_DISPATCH_WORKERS', 4),
+                dispatch_queue_size=config.get('TICKER_DISPATCH_QUEUE_SIZE', 1000)
+            )
+            self.stop_ticker(account_id)
+            self.tickers[account_id] = supervisor
+            supervisor.start()
             log_success(f"Started ticker for account {account_id}")
             return True
         except Exception as e:
             log_error(f"Error starting ticker for {account_id}: {str(e)}")
             return False
 
+    def _make_ticker(self, account_id, reconnect_max_tries, reconnect_max_delay):
+        """Build a KiteTicker with the account's current token; called again on every supervisor restart."""
+        account = self.accounts[account_id]
+        return self.ticker_factory(
+            account['api_key'], account['access_token'],
+            reconnect=True,
+            reconnect_max_tries=reconnect_max_tries,
+            reconnect_max_delay=reconnect_max_delay
+        )
+
     def stop_ticker(self, account_id):
         """Stop KiteTicker for an account."""
         self._ensure_initialized()
-        ticker = self.tickers.get(account_id)
-        if ticker:
+        supervisor = self.tickers.pop(account_id, None)
+        if supervisor:
             try:
-                ticker.close()
-                del self.tickers[account_id]
+                supervisor.stop()
                 log_info(f"Stopped ticker for account {account_id}")
             except Exception as e:
                 log_error(f"Error stopping ticker for {account_id}: {str(e)}")
 
-    def place_order(self, account_id, order_params):
-        """Place an order for an account."""
+    def ticker_status(self):
+        """Connection health of every running ticker."""
+        return [supervisor.status() for supervisor in list(self.tickers.values())]
+
+    def place_order(self, account_id, order_params, kite=None):
+        """
+        Place an order for an account, optionally with an already resolved client; returns the order id.
+        - Waits up to KITE_ORDER_WAIT seconds for a rate-limit slot; orders go ahead of queued reads.
+        - Raises OrderNotSent when the order provably never reached Kite (no session, no rate-limit slot,
+          connection refused, 429), OrderRejected when Kite refused it, and OrderUncertain otherwise.
+        - After an uncertain failure (e.g. a read timeout once the POST was sent) a tagged order is looked up
+          in a fresh order book; if Kite did take it, its order id is returned instead of raising.
+        """
         self._ensure_initialized()
-        kite = self.get_kite_instance(account_id)
+        kite = kite or self.get_kite_instance(account_id)
         if not kite:
-            return None
+            raise OrderNotSent(f"Account {account_id} is not connected")
 
+        if not self.rate_limiter.acquire(account_id, 'order', timeout=self.order_wait):
+            log_warning(f"Order for {account_id} not sent - rate limit slot not available in {self.order_wait}s")
+            raise OrderNotSent(f"No rate limit slot within {self.order_wait}s")
         try:
-            order_id = kite.place_order(**order_params)
+            with self._timed('place_order', account_id):
+                order_id = kite.place_order(**order_params)
+            self.order_books.invalidate(account_id)
             log_success(f"Order placed successfully for account {account_id}")
             return order_id
         except Exception as e:
             log_error(f"Error placing order for {account_id}: {str(e)}")
+            if getattr(e, 'code', None) == 429:
+                self.rate_limiter.penalize(account_id, 'order')
+                raise OrderNotSent(str(e)) from e
+            if self._never_sent(e):
+                raise OrderNotSent(str(e)) from e
+            if isinstance(e, KiteException) and not isinstance(e, (NetworkException, DataException)):
+                raise OrderRejected(str(e)) from e
+            self.order_books.invalidate(account_id)
+            order_id = self._find_tagged_order(account_id, order_params.get('tag'))
+            if order_id:
+                log_warning(f"Order for {account_id} was placed as {order_id} despite the error")
+                return order_id
+            raise OrderUncertain(str(e)) from e
+
+    @staticmethod
+    def _never_sent(error):
+        """True for connection failures that happen before any request byte reaches Kite."""
+        if isinstance(error, requests.exceptions.ConnectTimeout):
+            return True
+        if isinstance(error, requests.exceptions.ConnectionError) and error.args:
+            return isinstance(getattr(error.args[0], 'reason', None), NewConnectionError)
+        return False
+
+    def _find_tagged_order(self, account_id, tag):
+        """Return the id of the account's order carrying `tag`, or None if it is not found or cannot be looked up."""
+        if not tag:
+            return None
+        try:
+            orders = self._fetch_orders(account_id, wait=self.order_wait)
+        except Exception as e:
+            log_error(f"[KiteService] Could not look up order tagged {tag} for {account_id}: {str(e)}")
             return None
+        return next((order['order_id'] for order in orders if order.get('tag') == tag), None)
+
+    def _fetch_orders(self, account_id, wait=None):
+        """
+        Fetch a fresh order book snapshot from the Kite API; raises on failure.
+        - Reads yield to orders; if no read slot frees up within `wait` seconds (default KITE_READ_WAIT)
+          this raises and the order book cache keeps serving its last snapshot.
+        """
+        kite = self.get_kite_instance(account_id)
+        if not kite:
+            raise ValueError(f"Could not get Kite instance for {account_id}")
+        wait = self.read_wait if wait is None else wait
+        if not self.rate_limiter.acquire(account_id, 'read', timeout=wait):
+            raise RuntimeError(f"Read rate limit reached for {account_id}")
+        try:
+            with self._timed('orders', account_id):
+                orders = kite.orders()
+        except Exception as e:
+            if getattr(e, 'code', None) == 429:
+                self.rate_limiter.penalize(account_id, 'read')
+            raise
+        if self.trade_journal:
+            # Journal every executed order the broker reports
+            self.trade_journal.record_trades(
+                order_to_trade(account_id, order) for order in orders if order["status"] == "COMPLETE"
+            )
+        return orders
+
+    @staticmethod
+    @contextmanager
+    def _timed(endpoint, account_id):
+        """Record the duration and outcome of one Kite API call per endpoint and account."""
+        started = time.perf_counter()
+        status = 'error'
+        try:
+            yield
+            status = 'ok'
+        finally:
+            metrics.histogram(
+                'kite_api_request_seconds', 'Kite REST call duration', endpoint=endpoint, account=account_id
+            ).record(time.perf_counter() - started)
+            metrics.counter(
+                'kite_api_requests_total', 'Kite REST calls', endpoint=endpoint, account=account_id, status=status
+            ).inc()
+
+    def invalidate_orders(self, account_id=None):
+        """Force the next read of one account's (or every account's) orders to hit the Kite API."""
+        self.order_books.invalidate(account_id)
 
     def get_primary_account(self):
         """Get the primary account ID."""
@@ -185,43 +436,24 @@ class KiteService:
                 return account_id
         return None
 
-    def get_trades_for_account(self, account_id):
+    def sync_trade_history(self, account_id):
         """
-        Fetches all executed trades for the given account using the Kite API.
-        - No date filtering is needed; Kite API returns only current date's trades.
-        - Handles authentication, logging, and error checking.
-        - Returns a list of trades in the format expected by the frontend.
+        Bring the trade journal up to date with the account's executed trades.
+        - Every order book snapshot fetched from the Kite API is journaled; a cached book (younger than
+          ORDER_BOOK_TTL) was journaled when it was fetched, so the API is only called once it expired.
+        - Returns False if the account is not connected or the fetch fails.
         """
         self._ensure_initialized()
         account = self.accounts.get(account_id)
         if not account or not account.get('access_token'):
             log_error(f"[KiteService] No access token for account {account_id}")
-            return []
+            return False
         try:
-            kite = self.get_kite_instance(account_id)
-            if not kite:
-                log_error(f"[KiteService] Could not get Kite instance for {account_id}")
-                return []
-            all_orders = kite.orders()
-            trades = [
-                {
-                    "trade_id": order["order_id"],
-                    "account_id": account_id,
-                    "symbol": order["tradingsymbol"],
-                    "quantity": order["quantity"],
-                    "price": order["average_price"],
-                    "order_type": order["order_type"],
-                    "product_type": order["product"],
-                    "timestamp": str(order["order_timestamp"]),
-                }
-                for order in all_orders
-                if order["status"] == "COMPLETE"
-            ]
-            log_info(f"[KiteService] Fetched {len(trades)} trades for account {account_id}")
-            return trades
+            self.order_books.get_orders(account_id)
+            return True
         except Exception as e:
-            log_error(f"[KiteService] Error fetching trades for account {account_id}: {str(e)}")
-            return []
+            log_error(f"[KiteService] Error syncing trades for account {account_id}: {str(e)}")
+            return False
 
     def get_active_accounts(self):
         """
@@ -230,16 +462,41 @@ class KiteService:
         self._ensure_initialized()
         return [acc for acc in self.accounts.values() if acc.get('access_token')]
 
-    def get_trades_executed_counts(self):
+    def _count_executed_orders(self, account_id):
+        """Count COMPLETE orders for an account; raises if the fetch fails."""
+        orders = self.order_books.get_orders(account_id)
+        return sum(1 for order in orders if order["status"] == "COMPLETE")
+
+    def get_trades_executed_counts(self, deadline=None):
         """
-        Returns a list of dicts: {account_id, count} for each active account, counting executed trades for the current date.
+        Returns a list of dicts: {account_id, count, stale} for each active account, counting executed trades for the current date.
+        - All accounts are fetched in parallel and must answer within `deadline` seconds.
+        - Accounts that fail or miss the deadline report their last known count with stale=True.
         """
         active_accounts = self.get_active_accounts()
+        if deadline is None:
+            deadline = current_app.config.get('DASHBOARD_FETCH_DEADLINE', 3.0)
+
+        futures = {
+            acc['account_id']: self._gather_executor.submit(self._count_executed_orders, acc['account_id'])
+            for acc in active_accounts
+        }
+        done, _ = wait(futures.values(), timeout=deadline)
+
         result = []
-        for acc in active_accounts:
-            trades = self.get_trades_for_account(acc['account_id'])
+        for account_id, future in futures.items():
+            if future in done and future.exception() is None:
+                count = future.result()
+                self._last_counts[account_id] = count
+                stale = False
+            else:
+                reason = str(future.exception()) if future in done else f"no response within {deadline}s"
+                log_warning(f"[KiteService] Using stale trade count for account {account_id}: {reason}")
+                count = self._last_counts.get(account_id, 0)
+                stale = True
             result.append({
-                'account_id': acc['account_id'],
-                'count': len(trades)
+                'account_id': account_id,
+                'count': count,
+                'stale': stale
             })
-        return result 
\ No newline at end of file
+        return result
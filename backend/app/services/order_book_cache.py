@@ -0,0 +1,97 @@
+import threading
+import time
+
+class OrderBookCache:
+    """Per-account order book kept in memory.
+
+    A book is filled from one REST snapshot and then kept current by
+    order-update events from the ticker. Books older than `ttl` seconds are
+    re-fetched on the next read; if that fetch fails (e.g. the read is
+    rate limited) the expired book is served instead, as long as its
+    snapshot is younger than `max_stale` seconds.
+    """
+
+    def __init__(self, fetch, ttl=30.0, max_stale=300.0):
+        self._fetch = fetch
+        self.ttl = ttl
+        self.max_stale = max_stale
+        self._books = {}
+        self._lock = threading.Lock()
+        self._load_locks = {}
+        self._generations = {}
+
+    def get_orders(self, account_id):
+        """Return the account's orders, fetching a snapshot only if the book is missing or expired."""
+        book = self._book(account_id)
+        with self._lock:
+            return list(book['orders'].values())
+
+    def apply_update(self, account_id, order):
+        """Merge an order-update event into the account's book, if one is loaded."""
+        order_id = order.get('order_id')
+        if not order_id:
+            return
+        with self._lock:
+            book = self._books.get(account_id)
+            if not book:
+                return
+            book['orders'][order_id] = {**book['orders'].get(order_id, {}), **order}
+
+    def invalidate(self, account_id=None):
+        """Expire the cached book for one account, or for all accounts; it is kept only as a fallback."""
+        with self._lock:
+            accounts = list(self._generations) if account_id is None else [account_id]
+            for key in accounts:
+                book = self._books.get(key)
+                if book:
+                    book['expired'] = True
+                self._generations[key] = self._generations.get(key, 0) + 1
+
+    def drop(self, account_id=None):
+        """Forget the cached book for one account, or for all accounts, e.g. when its session ends."""
+        with self._lock:
+            accounts = list(self._generations) if account_id is None else [account_id]
+            for key in accounts:
+                self._books.pop(key, None)
+                self._generations[key] = self._generations.get(key, 0) + 1
+
+    def _book(self, account_id):
+        book = self._fresh_book(account_id)
+        if book:
+            return book
+
+        # One snapshot per account at a time; concurrent readers wait for it
+        with self._load_lock(account_id):
+            book = self._fresh_book(account_id)
+            if book:
+                return book
+            with self._lock:
+                generation = self._generations.setdefault(account_id, 0)
+                stale = self._books.get(account_id)
+            try:
+                orders = self._fetch(account_id)
+            except Exception:
+                if stale and time.monotonic() - stale['loaded_at'] < self.max_stale:
+                    return stale
+                raise
+            book = {
+                'orders': {order['order_id']: order for order in orders},
+                'loaded_at': time.monotonic(),
+                'expired': False
+            }
+            with self._lock:
+                # An invalidation during the fetch means this snapshot may already be old
+                if self._generations[account_id] == generation:
+                    self._books[account_id] = book
+            return book
+
+    def _fresh_book(self, account_id):
+        with self._lock:
+            book = self._books.get(account_id)
+        if book and not book['expired'] and time.monotonic() - book['loaded_at'] < self.ttl:
+            return book
+        return None
+
+    def _load_lock(self, account_id):
+        with self._lock:
+            return self._load_locks.setdefault(account_id, threading.Lock())
@@ -0,0 +1,43 @@
+from collections import OrderedDict
+import threading
+import time
+
+class SeenOrderEvents:
+    """Bounded, time-windowed record of order events that were already handled.
+
+    Events are keyed on (order_id, status, filled_quantity), so the OPEN,
+    partial-fill and COMPLETE transitions of one order are each handled once,
+    while resends of the same transition (e.g. after a ticker reconnect) are
+    recognised as duplicates. Keys expire after `window` seconds and the
+    oldest keys are evicted beyond `max_size`. Pass `key` to key events
+    differently, e.g. on order_id alone.
+    """
+
+    def __init__(self, max_size=10000, window=24 * 60 * 60, key=None):
+        self.max_size = max_size
+        self.window = window
+        self._key = key or self.key
+        self._seen = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(order):
+        return (str(order.get('order_id')), order.get('status'), order.get('filled_quantity'))
+
+    def first_seen(self, order):
+        """Record the order event; return True only the first time it is seen."""
+        key = self._key(order)
+        now = time.monotonic()
+        with self._lock:
+            self._evict(now)
+            if key in self._seen:
+                return False
+            self._seen[key] = now
+            return True
+
+    def _evict(self, now):
+        while self._seen:
+            key, seen_at = next(iter(self._seen.items()))
+            if len(self._seen) <= self.max_size and now - seen_at < self.window:
+                break
+            del self._seen[key]
@@ -0,0 +1,72 @@
+import queue
+import threading
+import time
+import zlib
+from ..utils.logger import log_error, log_warning
+from ..utils.metrics import metrics
+
+class OrderDispatcher:
+    """Moves order-update handling off the websocket thread.
+
+    Events are sharded by tradingsymbol onto `workers` bounded queues, each
+    drained by one thread, so updates for one symbol are handled in the
+    order they arrived while different symbols proceed in parallel. The
+    websocket thread never blocks: when a shard is full the event is
+    dropped, counted, and `on_overflow` is called so the gap can be
+    backfilled from an order snapshot.
+    """
+
+    def __init__(self, account_id, handler, on_overflow=None, workers=4, queue_size=1000):
+        self.account_id = account_id
+        self._handler = handler
+        self._on_overflow = on_overflow
+        self._queues = [queue.Queue(maxsize=queue_size) for _ in range(workers)]
+        self.dropped = 0
+        self._stopped = threading.Event()
+        self._threads = [
+            threading.Thread(target=self._run, args=(q,), name=f'order-dispatch-{account_id}-{i}', daemon=True)
+            for i, q in enumerate(self._queues)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def submit(self, order, block=False, timeout=None):
+        """Queue an order update; returns False if its shard was full."""
+        shard = self._queues[zlib.crc32(str(order.get('tradingsymbol', '')).encode()) % len(self._queues)]
+        try:
+            shard.put((time.perf_counter(), order), block=block, timeout=timeout)
+            return True
+        except queue.Full:
+            self.dropped += 1
+            metrics.counter(
+                'ticker_dispatch_overflow_total', 'Order updates dropped because a dispatch queue was full',
+                account=self.account_id
+            ).inc()
+            log_warning(f"[Ticker] Dispatch queue full for account {self.account_id}; order {order.get('order_id')} dropped")
+            if self._on_overflow:
+                self._on_overflow()
+            return False
+
+    def depth(self):
+        return sum(q.qsize() for q in self._queues)
+
+    def stop(self):
+        """Let the workers finish what is queued, then exit."""
+        self._stopped.set()
+
+    def _run(self, shard):
+        wait_histogram = metrics.histogram(
+            'ticker_dispatch_wait_seconds', 'Time order updates spent queued before handling', account=self.account_id
+        )
+        while True:
+            try:
+                queued_at, order = shard.get(timeout=0.5)
+            except queue.Empty:
+                if self._stopped.is_set():
+                    return
+                continue
+            wait_histogram.record(time.perf_counter() - queued_at)
+            try:
+                self._handler(order)
+            except Exception as e:
+                log_error(f"[Ticker] Order update handler failed for {self.account_id}: {str(e)}")
@@ -0,0 +1,8 @@
+class OrderNotSent(Exception):
+    """The order provably never reached the broker, so sending it again cannot duplicate it."""
+
+class OrderRejected(Exception):
+    """The broker answered and refused the order; sending it again would only repeat the rejection."""
+
+class OrderUncertain(Exception):
+    """The request may have reached the broker and its outcome is unknown; it must not be resent."""
@@ -0,0 +1,103 @@
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+import threading
+import time
+from .order_errors import OrderNotSent, OrderUncertain
+
+class OrderFanOut:
+    """Send one order to many follower accounts at the same time.
+
+    Every account gets its own attempt on a bounded thread pool. Only sends
+    that raise OrderNotSent are retried, since only those cannot have placed
+    an order; an OrderUncertain send is reported as `unknown` and never
+    resent. Retries are re-scheduled with exponential backoff instead of
+    sleeping in a worker, so a failing account never holds a slot that
+    another account could use.
+    No attempt starts once an account's deadline has passed; an attempt that
+    was already in flight and succeeds late is handed to `on_late`.
+    """
+
+    def __init__(self, max_workers=16, account_timeout=5.0, max_retries=2, retry_backoff=0.25):
+        self.account_timeout = account_timeout
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='order-fanout')
+
+    def run(self, jobs, send, on_late=None):
+        """
+        Call send(account_id, params) for every (account_id, params) in jobs.
+        - All accounts start at once; each has account_timeout seconds to get an ack.
+        - send returns the broker order id, or raises on failure (see the class docstring for retries).
+        - Returns one result dict per account with status (success, failed, unknown, timeout), attempts and latency_ms.
+        - An account reported as timeout whose in-flight send still succeeds, or ends unknown,
+          is passed to on_late(result).
+        """
+        started = time.monotonic()
+        futures = {}
+        for account_id, params in jobs:
+            future = Future()
+            futures[future] = account_id
+            self._executor.submit(self._attempt, send, account_id, params, future, started, 1)
+
+        done, pending = wait(futures, timeout=self.account_timeout)
+        results = [future.result() for future in done]
+        for future in pending:
+            results.append(self._result(futures[future], 'timeout', started, None, None, None))
+            if on_late:
+                future.add_done_callback(lambda late: self._late(late.result(), on_late))
+        return results
+
+    def shutdown(self):
+        """Stop accepting new fan-outs and release the worker threads."""
+        self._executor.shutdown(wait=False)
+
+    def _attempt(self, send, account_id, params, future, started, attempt):
+        # run() has already reported this account as timed out; never place an order nobody tracks
+        if time.monotonic() - started >= self.account_timeout:
+            future.set_result(self._result(account_id, 'timeout', started, attempt - 1 or None, None, None))
+            return
+
+        try:
+            order_id = send(account_id, params)
+        except OrderNotSent as e:
+            order_id, error, retryable = None, str(e), True
+        except OrderUncertain as e:
+            future.set_result(self._result(account_id, 'unknown', started, attempt, None, str(e)))
+            return
+        except Exception as e:
+            order_id, error, retryable = None, str(e), False
+        else:
+            error, retryable = 'no order id returned', False
+
+        if order_id:
+            future.set_result(self._result(account_id, 'success', started, attempt, order_id, None))
+            return
+
+        delay = self.retry_backoff * (2 ** (attempt - 1))
+        elapsed = time.monotonic() - started
+        if not retryable or attempt > self.max_retries or elapsed + delay >= self.account_timeout:
+            future.set_result(self._result(account_id, 'failed', started, attempt, None, error))
+            return
+
+        timer = threading.Timer(
+            delay,
+            self._executor.submit,
+            args=(self._attempt, send, account_id, params, future, started, attempt + 1)
+        )
+        timer.daemon = True
+        timer.start()
+
+    @staticmethod
+    def _late(result, on_late):
+        if result['status'] in ('success', 'unknown'):
+            on_late(result)
+
+    @staticmethod
+    def _result(account_id, status, started, attempts, order_id, error):
+        return {
+            'account_id': account_id,
+            'status': status,
+            'order_id': order_id,
+            'attempts': attempts,
+            'latency_ms': round((time.monotonic() - started) * 1000, 2),
+            'error': error
+        }
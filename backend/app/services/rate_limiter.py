@@ -0,0 +1,84 @@
+from collections import deque
+import math
+import threading
+import time
+from ..utils.metrics import metrics
+
+# Kite counts requests per second; a little slack absorbs clock skew between us and the broker
+WINDOW = 1.05
+
+class RateLimiter:
+    """Per-account request scheduler that keeps Kite calls under the broker's limits.
+
+    Every account has one window for order placement and one for reads. A
+    call may go out when fewer than `limit` calls of its kind left in the
+    last second, which is the highest rate Kite accepts without a 429.
+    Orders take priority: while an order is waiting for its account, reads
+    for that account hold back so they cannot use up the connection or
+    delay the order.
+    """
+
+    def __init__(self, order_rate=10, read_rate=10):
+        self.rates = {'order': order_rate, 'read': read_rate}
+        self._accounts = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, account_id, kind='read', timeout=None):
+        """Wait for a slot; returns False if none frees up within timeout seconds."""
+        if not self.rates[kind]:
+            return True
+        state = self._state(account_id)
+        started = time.monotonic()
+        deadline = None if timeout is None else started + timeout
+        with state['ready']:
+            if kind == 'order':
+                state['orders_waiting'] += 1
+            try:
+                while True:
+                    now = time.monotonic()
+                    sent = state[kind]
+                    while sent and now - sent[0] >= WINDOW:
+                        sent.popleft()
+                    blocked = kind == 'read' and state['orders_waiting']
+                    if not blocked and len(sent) < self.rates[kind]:
+                        sent.append(now)
+                        metrics.histogram(
+                            'kite_rate_limit_wait_seconds', 'Time calls waited for a rate-limit slot',
+                            kind=kind, account=account_id
+                        ).record(now - started)
+                        return True
+                    wait = sent[0] + WINDOW - now if sent and not blocked else WINDOW
+                    if deadline is not None:
+                        if now >= deadline:
+                            metrics.counter(
+                                'kite_rate_limited_total', 'Calls given up after waiting for a rate-limit slot',
+                                kind=kind, account=account_id
+                            ).inc()
+                            return False
+                        wait = min(wait, deadline - now)
+                    state['ready'].wait(wait)
+            finally:
+                if kind == 'order':
+                    state['orders_waiting'] -= 1
+                    state['ready'].notify_all()
+
+    def penalize(self, account_id, kind='order'):
+        """After a 429, treat the current window as full so no call of this kind goes out for a second."""
+        state = self._state(account_id)
+        with state['ready']:
+            now = time.monotonic()
+            state[kind].clear()
+            # Rates may be configured as floats; a full window holds that many calls, rounded up
+            state[kind].extend([now] * math.ceil(self.rates[kind]))
+
+    def _state(self, account_id):
+        state = self._accounts.get(account_id)
+        if state is None:
+            with self._lock:
+                state = self._accounts.setdefault(account_id, {
+                    'order': deque(),
+                    'read': deque(),
+                    'orders_waiting': 0,
+                    'ready': threading.Condition()
+                })
+        return state
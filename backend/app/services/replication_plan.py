@@ -0,0 +1,72 @@
+from collections import namedtuple
+from kiteconnect import KiteConnect
+
+FollowerTarget = namedtuple('FollowerTarget', ['account_id', 'multiplier', 'client'])
+
+class ReplicationPlan:
+    """Everything the copier needs per order event, computed once.
+
+    Holds the primary account id, the follower accounts with their
+    multipliers and resolved KiteConnect clients, and frozenset allow-lists.
+    A plan is tagged with the config version it was built from and is
+    rebuilt only when that version changes.
+    """
+
+    __slots__ = ('version', 'primary_id', 'followers', 'clients', 'order_types', 'product_types')
+
+    def __init__(self, version, primary_id, followers, order_types, product_types):
+        self.version = version
+        self.primary_id = primary_id
+        self.followers = tuple(followers)
+        self.clients = {target.account_id: target.client for target in self.followers}
+        self.order_types = frozenset(order_types)
+        self.product_types = frozenset(product_types)
+
+    @classmethod
+    def build(cls, version, accounts, allowed_types, get_client):
+        """Build a plan from the account registry and the allowed order types."""
+        primary_id = next((account_id for account_id, account in accounts.items() if account.get('primary')), None)
+        followers = []
+        for account_id, account in accounts.items():
+            if account_id == primary_id:
+                continue
+            client = get_client(account_id)
+            # Followers without a session can't take orders; leave them out
+            if client is None:
+                continue
+            followers.append(FollowerTarget(account_id, account.get('ps_multiplier', 1.0), client))
+        return cls(version, primary_id, followers, allowed_types['order_types'], allowed_types['product_types'])
+
+    def allows(self, order):
+        return order.get('order_type') in self.order_types and order.get('product') in self.product_types
+
+    def follower_orders(self, order, as_market=False):
+        """
+        Return (account_id, order_params) for every follower whose scaled quantity is non-zero.
+        - `as_market` copies the order as a MARKET order, without its price or trigger.
+        - Copies are tagged with the primary order id, so a send whose outcome was lost can be found again.
+        """
+        order_type = 'MARKET' if as_market else order.get('order_type')
+        base_params = {
+            'variety': KiteConnect.VARIETY_REGULAR,
+            'tradingsymbol': order.get('tradingsymbol'),
+            'exchange': order.get('exchange'),
+            'transaction_type': order.get('transaction_type'),
+            'order_type': order_type,
+            'product': order.get('product'),
+            'price': 0 if as_market else order.get('price', 0),
+            # Kite tags are at most 20 characters
+            'tag': f"cp{str(order.get('order_id'))[-18:]}"
+        }
+        # Add trigger price for SL and SL-M orders
+        if order_type in ('SL', 'SL-M'):
+            base_params['trigger_price'] = order.get('trigger_price')
+
+        primary_quantity = order.get('quantity', 0)
+        jobs = []
+        for target in self.followers:
+            # Scale quantity based on multiplier
+            quantity = int(primary_quantity * target.multiplier)
+            if quantity:
+                jobs.append((target.account_id, {**base_params, 'quantity': quantity}))
+        return jobs
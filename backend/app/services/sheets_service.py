@@ -2,12 +2,22 @@ import gspread
 from oauth2client.service_account import ServiceAccountCredentials
 from flask import current_app
 from ..utils.logger import log_info, log_error, log_success
+from .export_queue import ExportQueue
 import json
+import threading
+import time
 
 class SheetsService:
     def __init__(self):
         self.client = None
         self.sheet = None
+        self.export_queue = None
+        self._tags = None
+        self._sorted_tags = []
+        self._tags_loaded_at = 0
+        self._tags_refreshing = False
+        self._tags_lock = threading.Lock()
+        self.tags_ttl = 300
         self._initialized = False
 
     def _ensure_initialized(self):
@@ -15,6 +25,13 @@ class SheetsService:
         if not self._initialized:
             with current_app.app_context():
                 self.initialize_client()
+                self.export_queue = ExportQueue(
+                    self._append_rows,
+                    self._is_retryable_error,
+                    flush_interval=current_app.config.get('EXPORT_FLUSH_INTERVAL_MS', 500) / 1000,
+                    max_batch_rows=current_app.config.get('EXPORT_BATCH_ROWS', 500)
+                )
+                self.tags_ttl = current_app.config.get('TAGS_REFRESH_TTL', 300)
                 self._initialized = True
 
     def initialize_client(self):
@@ -35,65 +52,110 @@ class SheetsService:
             self.sheet = None
 
     def export_trades(self, trades, tag):
-        """Export trades to Google Sheets."""
+        """
+        Queue trades for export to Google Sheets.
+        - Rows are written in the background, merged with other pending exports.
+        - Returns a job id for get_export_status, or None if the sheet is unavailable.
+        """
         self._ensure_initialized()
         if not self.sheet:
             log_error("Google Sheets client not initialized")
-            return False
+            return None
 
-        try:
-            # Prepare data
-            data = []
-            for trade in trades:
-                # Get values with fallbacks to ensure we always have something to display
-                order_id = trade.get('order_id', trade.get('trade_id', ''))
-                account_id = trade.get('account_id', '')
-                symbol = trade.get('tradingsymbol', trade.get('symbol', ''))
-                quantity = trade.get('quantity', '')
-                price = trade.get('price', '')
-                order_type = trade.get('order_type', '')
-                product = trade.get('product', trade.get('product_type', ''))
-                timestamp = trade.get('timestamp', '')
-                
-                row = [
-                    order_id,
-                    account_id,
-                    symbol,
-                    quantity,
-                    price,
-                    order_type,
-                    product,
-                    timestamp,
-                    tag
-                ]
-                data.append(row)
+        # Prepare data
+        data = []
+        for trade in trades:
+            # Get values with fallbacks to ensure we always have something to display
+            order_id = trade.get('order_id', trade.get('trade_id', ''))
+            account_id = trade.get('account_id', '')
+            symbol = trade.get('tradingsymbol', trade.get('symbol', ''))
+            quantity = trade.get('quantity', '')
+            price = trade.get('price', '')
+            order_type = trade.get('order_type', '')
+            product = trade.get('product', trade.get('product_type', ''))
+            timestamp = trade.get('timestamp', '')
 
-            # Append to sheet
-            self.sheet.append_rows(data)
-            log_success(f"Successfully exported {len(trades)} trades to Google Sheets")
-            return True
-        except Exception as e:
-            log_error(f"Error exporting trades to Google Sheets: {str(e)}")
+            row = [
+                order_id,
+                account_id,
+                symbol,
+                quantity,
+                price,
+                order_type,
+                product,
+                timestamp,
+                tag
+            ]
+            data.append(row)
+
+        job_id = self.export_queue.submit(data)
+        log_info(f"Queued {len(trades)} trades for Google Sheets export (job {job_id})")
+        return job_id
+
+    def get_export_status(self, job_id):
+        """Return the status dict of an export job, or None if it is unknown."""
+        self._ensure_initialized()
+        return self.export_queue.status(job_id)
+
+    def _append_rows(self, rows):
+        """Append rows to the sheet in one API call; raises on failure."""
+        self.sheet.append_rows(rows)
+        self._add_tags(row[-1] for row in rows)
+        log_success(f"Successfully exported {len(rows)} trades to Google Sheets")
+
+    @staticmethod
+    def _is_retryable_error(error):
+        """Quota (429) and server-side (5xx) Sheets API errors are worth retrying."""
+        if not isinstance(error, gspread.exceptions.APIError):
             return False
+        status = getattr(error.response, 'status_code', None)
+        return status == 429 or (status is not None and status >= 500)
 
     def get_all_tags(self):
-        """Get all tags from the sheet."""
+        """
+        Get all tags, served from the in-memory tag index.
+        - The index is seeded once from the tag column and updated whenever an export is written.
+        - Once older than tags_ttl seconds it is refreshed in the background; callers never wait for it.
+        """
         self._ensure_initialized()
         if not self.sheet:
             return []
 
-        try:
-            # Get all values from the tag column (last column)
-            all_values = self.sheet.get_all_values()
-            if not all_values:
-                return []
+        if self._tags is None:
+            self._refresh_tags()
+        elif time.monotonic() - self._tags_loaded_at > self.tags_ttl:
+            with self._tags_lock:
+                start = not self._tags_refreshing
+                self._tags_refreshing = True
+            if start:
+                threading.Thread(target=self._refresh_tags, name='sheets-tags', daemon=True).start()
+        return self._sorted_tags
 
-            # Extract unique tags
-            tags = set()
-            for row in all_values[1:]:  # Skip header
-                if row and row[-1]:  # Check if row exists and has a tag
-                    tags.add(row[-1])
-            return sorted(list(tags))
+    def _refresh_tags(self):
+        """Rebuild the tag index from a single-column read of the sheet's tag (last) column."""
+        try:
+            # The header row tells us where the last column is, wherever the sheet's layout puts it
+            tag_column = len(self.sheet.row_values(1))
+            if not tag_column:
+                raise ValueError("sheet has no header row")
+            column = self.sheet.col_values(tag_column)
+            tags = {tag for tag in column[1:] if tag}  # Skip header
+            with self._tags_lock:
+                self._tags = tags
+                self._sorted_tags = sorted(tags)
+                self._tags_loaded_at = time.monotonic()
         except Exception as e:
             log_error(f"Error getting tags from Google Sheets: {str(e)}")
-            return [] 
\ No newline at end of file
+        finally:
+            with self._tags_lock:
+                self._tags_refreshing = False
+
+    def _add_tags(self, tags):
+        """Add newly written tags to the index in place."""
+        with self._tags_lock:
+            if self._tags is None:
+                return
+            new_tags = {tag for tag in tags if tag} - self._tags
+            if new_tags:
+                self._tags |= new_tags
+                self._sorted_tags = sorted(self._tags)
@@ -0,0 +1,240 @@
+from collections import OrderedDict
+import random
+import threading
+import time
+from twisted.internet import reactor
+from ..utils.logger import log_info, log_warning, log_error, log_success
+from ..utils.metrics import metrics
+from .order_dispatcher import OrderDispatcher
+
+# Orders whose last state is remembered for backfill diffs; Kite's order book only covers the current day
+SEEN_MAX_ORDERS = 10000
+
+def call_in_reactor(fn, *args, **kwargs):
+    """Twisted is not thread-safe: once its reactor runs, websocket calls are handed to the reactor thread."""
+    if reactor.running:
+        reactor.callFromThread(fn, *args, **kwargs)
+    else:
+        fn(*args, **kwargs)
+
+class TickerSupervisor:
+    """Keeps one account's order-update websocket alive and gap-free.
+
+    KiteTicker's own reconnect (exponential backoff with jitter) handles
+    short drops. When it gives up, or the first connect fails, the
+    supervisor starts a fresh ticker after a full-jitter backoff, forever
+    until stop(). After every reconnect the orders that changed during the
+    gap are found by diffing one orders() snapshot against the last state
+    seen per order id, and delivered as if they had arrived on the socket.
+    The websocket thread only enqueues updates; an OrderDispatcher hands
+    them to the handler, in order per tradingsymbol.
+    """
+
+    def __init__(self, account_id, make_ticker, fetch_orders, on_order_update,
+                 restart_base_delay=1.0, restart_max_delay=60.0, dispatch_workers=4, dispatch_queue_size=1000):
+        self.account_id = account_id
+        self._make_ticker = make_ticker
+        self._fetch_orders = fetch_orders
+        self._on_order_update = on_order_update
+        self.restart_base_delay = restart_base_delay
+        self.restart_max_delay = restart_max_delay
+        self._lock = threading.Lock()
+        self._backfill_lock = threading.Lock()
+        self._ticker = None
+        self._timer = None
+        self._stopped = False
+        # order_id -> (status, filled_quantity) of the latest event delivered, oldest first
+        self._seen = OrderedDict()
+        self._seeded = False
+        self._restarts = 0
+        self._backfill_pending = False
+        self._dispatcher = OrderDispatcher(
+            account_id, self._deliver, self._request_backfill, dispatch_workers, dispatch_queue_size
+        )
+        self._health = {
+            'state': 'stopped',
+            'connected_since': None,
+            'last_event_at': None,
+            'last_error': None,
+            'connects': 0,
+            'disconnects': 0,
+            'backfilled': 0
+        }
+
+    def start(self):
+        with self._lock:
+            self._stopped = False
+        self._connect()
+
+    def stop(self):
+        with self._lock:
+            self._stopped = True
+            if self._timer:
+                self._timer.cancel()
+                self._timer = None
+            ticker, self._ticker = self._ticker, None
+            self._health['state'] = 'stopped'
+        if ticker:
+            call_in_reactor(ticker.close)
+        self._dispatcher.stop()
+
+    def status(self):
+        with self._lock:
+            health = dict(self._health)
+        health.update(queue_depth=self._dispatcher.depth(), dropped=self._dispatcher.dropped)
+        return {'account_id': self.account_id, **health}
+
+    def _connect(self):
+        with self._lock:
+            if self._stopped:
+                return
+            self._timer = None
+            self._health['state'] = 'connecting'
+        try:
+            ticker = self._make_ticker()
+            ticker.on_order_update = self._handle_order_update
+            ticker.on_connect = self._handle_connect
+            ticker.on_close = self._handle_close
+            ticker.on_error = self._handle_error
+            ticker.on_reconnect = self._handle_reconnect
+            ticker.on_noreconnect = self._handle_noreconnect
+            with self._lock:
+                self._ticker = ticker
+            # Restarts run on a timer thread while the reactor may already be running for other tickers
+            call_in_reactor(self._start_ticker, ticker)
+        except Exception as e:
+            self._set_error(str(e))
+            self._schedule_restart()
+
+    def _start_ticker(self, ticker):
+        with self._lock:
+            if self._stopped or self._ticker is not ticker:
+                return
+        try:
+            ticker.connect(threaded=True)
+        except Exception as e:
+            self._set_error(str(e))
+            self._schedule_restart()
+
+    def _handle_order_update(self, ws, data):
+        # Runs on the websocket thread: enqueue only, never block
+        self._dispatcher.submit(data)
+
+    def _deliver(self, order):
+        """Called on a dispatcher worker for each update, live or backfilled."""
+        metrics.counter('ticker_order_events_total', 'Order updates delivered', account=self.account_id).inc()
+        order_id = order.get('order_id')
+        with self._lock:
+            if order_id:
+                self._mark_seen(order)
+            self._health['last_event_at'] = time.time()
+        self._on_order_update(order)
+
+    def _request_backfill(self):
+        """A dropped update is recovered from the next snapshot diff; one backfill at a time."""
+        with self._lock:
+            if self._backfill_pending:
+                return
+            self._backfill_pending = True
+        threading.Thread(target=self._backfill, name=f'ticker-backfill-{self.account_id}', daemon=True).start()
+
+    def _handle_connect(self, ws, response):
+        with self._lock:
+            reconnected = self._health['connects'] > 0
+            self._health.update(state='connected', connected_since=time.time())
+            self._health['connects'] += 1
+            self._restarts = 0
+        if reconnected:
+            metrics.counter('ticker_reconnects_total', 'Ticker reconnects', account=self.account_id).inc()
+        log_success(f"[Ticker] Connected for account {self.account_id}")
+        # The snapshot is a REST call; keep it off the websocket thread
+        threading.Thread(
+            target=self._backfill if reconnected else self._seed,
+            name=f'ticker-backfill-{self.account_id}', daemon=True
+        ).start()
+
+    def _handle_close(self, ws, code, reason):
+        with self._lock:
+            if self._health['state'] == 'connected':
+                self._health['disconnects'] += 1
+            if not self._stopped:
+                self._health['state'] = 'reconnecting'
+        log_warning(f"[Ticker] Connection closed for account {self.account_id}: {code} {reason}")
+
+    def _handle_error(self, ws, code, reason):
+        self._set_error(f"{code} {reason}")
+
+    def _handle_reconnect(self, ws, attempts_count):
+        log_warning(f"[Ticker] Reconnecting account {self.account_id}, attempt {attempts_count}")
+
+    def _handle_noreconnect(self, ws):
+        log_warning(f"[Ticker] Ticker gave up reconnecting for account {self.account_id}; restarting it")
+        self._schedule_restart()
+
+    def _schedule_restart(self):
+        with self._lock:
+            if self._stopped or self._timer:
+                return
+            self._restarts += 1
+            cap = min(self.restart_max_delay, self.restart_base_delay * (2 ** (self._restarts - 1)))
+            delay = random.uniform(0, cap)
+            self._health['state'] = 'reconnecting'
+            self._timer = threading.Timer(delay, self._connect)
+            self._timer.daemon = True
+            self._timer.start()
+        log_info(f"[Ticker] Restarting ticker for account {self.account_id} in {delay:.1f}s")
+
+    def _seed(self):
+        """Record the state of every order at first connect, so later diffs only cover real gaps."""
+        with self._backfill_lock:
+            try:
+                orders = self._fetch_orders()
+                with self._lock:
+                    for order in orders:
+                        # A live event may already have arrived; it is newer than the snapshot
+                        if order['order_id'] not in self._seen:
+                            self._mark_seen(order)
+                self._seeded = True
+            except Exception as e:
+                log_error(f"[Ticker] Could not take initial order snapshot for {self.account_id}: {str(e)}")
+
+    def _backfill(self):
+        """Deliver every order whose state differs from the last one seen before the gap."""
+        with self._backfill_lock:
+            with self._lock:
+                self._backfill_pending = False
+            try:
+                orders = self._fetch_orders()
+            except Exception as e:
+                log_error(f"[Ticker] Backfill snapshot failed for {self.account_id}: {str(e)}")
+                return
+            with self._lock:
+                missed = [
+                    order for order in orders
+                    if self._seen.get(order['order_id']) != (order.get('status'), order.get('filled_quantity'))
+                ]
+                if not self._seeded:
+                    # Without a baseline every order would look new; take this snapshot as the baseline
+                    for order in missed:
+                        self._mark_seen(order)
+                    self._seeded = True
+                    return
+            for order in missed:
+                # Through the dispatcher, so per-symbol order holds against live updates too
+                self._dispatcher.submit(dict(order, account_id=self.account_id), block=True, timeout=5)
+            with self._lock:
+                self._health['backfilled'] += len(missed)
+            if missed:
+                log_info(f"[Ticker] Backfilled {len(missed)} order updates for account {self.account_id}")
+
+    def _mark_seen(self, order):
+        """Remember an order's latest state, dropping the least recently updated beyond SEEN_MAX_ORDERS; hold _lock."""
+        self._seen[order['order_id']] = (order.get('status'), order.get('filled_quantity'))
+        self._seen.move_to_end(order['order_id'])
+        while len(self._seen) > SEEN_MAX_ORDERS:
+            self._seen.popitem(last=False)
+
+    def _set_error(self, error):
+        with self._lock:
+            self._health['last_error'] = error
+        log_error(f"[Ticker] Error for account {self.account_id}: {error}")
@@ -0,0 +1,40 @@
+import threading
+from ..utils.pubsub import PubSub
+
+class TradeBus:
+    """Push trade events to live subscribers.
+
+    Published trades are appended to a TradeStore, whose sequence number
+    doubles as the SSE event id. The store's recent records let a
+    reconnecting client resume from its Last-Event-ID without gaps or
+    duplicates.
+    """
+
+    def __init__(self, store, queue_size=256):
+        self.store = store
+        self._pubsub = PubSub(queue_size)
+        self._lock = threading.Lock()
+
+    def publish(self, trade):
+        """Store a trade and deliver its TradeRecord to all subscribers."""
+        with self._lock:
+            record = self.store.append(trade)
+            self._pubsub.publish(record)
+        return record
+
+    def subscribe(self, last_event_id=None):
+        """
+        Subscribe to new trades.
+        - Returns (subscription, missed) where missed holds the stored records after last_event_id.
+        - Subscribing and reading the store happen under the publish lock, so nothing falls in between.
+        """
+        with self._lock:
+            subscription = self._pubsub.subscribe()
+            if last_event_id is None:
+                missed = []
+            else:
+                missed = list(self.store.since(last_event_id))
+        return subscription, missed
+
+    def unsubscribe(self, subscription):
+        self._pubsub.unsubscribe(subscription)
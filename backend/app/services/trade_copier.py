@@ -1,42 +1,138 @@
 import json
 from flask import current_app
-from ..utils.logger import log_info, log_error, log_success
+from ..utils.logger import log_info, log_warning, log_error, log_success
+from ..utils.metrics import metrics
 from .kite_service import KiteService
+from .order_fanout import OrderFanOut
+from .trade_history import order_to_trade
+from .order_dedup import SeenOrderEvents
+from .replication_plan import ReplicationPlan
+import threading
 import time
+import uuid
 
 class TradeCopier:
-    def __init__(self, kite_service):
+    """Copies orders placed on the primary account to every follower account.
+
+    Each primary order is copied once. MARKET orders are copied when they
+    fill (COMPLETE). LIMIT, SL and SL-M orders are copied when they are
+    placed (OPEN, or TRIGGER PENDING for stop-losses), so followers rest at
+    the primary's price and trigger. A copy made after the fill could sit on
+    a level the market has already crossed, and Kite rejects such SL orders.
+    If the first event seen for a non-MARKET order is already its fill, the
+    fill is copied as a MARKET order. Later modifications and cancellations
+    of the primary order are not copied.
+    """
+
+    # Statuses at which a non-MARKET order is copied as placed
+    PLACEMENT_STATUSES = frozenset({'OPEN', 'TRIGGER PENDING'})
+
+    def __init__(self, kite_service, trade_bus=None, trade_journal=None, config_watcher=None):
         self.kite_service = kite_service
+        self.trade_bus = trade_bus
+        self.trade_journal = trade_journal
+        self.config_watcher = config_watcher
         self.is_replicating = False
+        self.dry_run = True
+        self.seen_events = SeenOrderEvents()
+        # Primary orders already copied, whichever of their events triggered the copy
+        self.replicated_orders = SeenOrderEvents(key=lambda order: str(order.get('order_id')))
         self._initialized = False
-        self.allowed_types = {
+        self.fan_out = None
+        self._plan = None
+        self._plan_lock = threading.Lock()
+        # (version, allowed types), swapped as one value so readers never pair a version with the wrong types
+        self._allowed = (0, {
             "order_types": ["MARKET", "LIMIT", "SL"],
             "product_types": ["MIS", "NRML"]
-        }
+        })
+
+    @property
+    def allowed_types(self):
+        return self._allowed[1]
 
     def _ensure_initialized(self):
         """Ensure the service is initialized with app context."""
         if not self._initialized:
             with current_app.app_context():
+                # The plan is built from the account registry, so it must be loaded first
+                self.kite_service._ensure_initialized()
                 self.load_allowed_order_types()
+                if self.trade_journal:
+                    self.trade_journal._ensure_initialized()
+                self.fan_out = OrderFanOut(
+                    max_workers=current_app.config.get('REPLICATION_MAX_WORKERS', 16),
+                    account_timeout=current_app.config.get('REPLICATION_ACCOUNT_TIMEOUT', 5.0),
+                    max_retries=current_app.config.get('REPLICATION_MAX_RETRIES', 2),
+                    retry_backoff=current_app.config.get('REPLICATION_RETRY_BACKOFF', 0.25)
+                )
+                self.dry_run = current_app.config.get('REPLICATION_DRY_RUN', True)
+                if self.config_watcher:
+                    self.config_watcher.watch(
+                        current_app.config['ALLOWED_ORDER_TYPES_PATH'], self.reload_allowed_order_types
+                    )
                 self._initialized = True
 
     def load_allowed_order_types(self):
         """Load allowed order types from config file."""
         try:
-            with open(current_app.config['ALLOWED_ORDER_TYPES_PATH'], 'r') as f:
-                self.allowed_types = json.load(f)[0]
+            self._set_allowed_types(self._read_allowed_types(current_app.config['ALLOWED_ORDER_TYPES_PATH']))
             log_info("Allowed order types loaded successfully")
         except Exception as e:
             log_error(f"Error loading allowed order types: {str(e)}")
 
+    def reload_allowed_order_types(self, path):
+        """Swap in allowed order types after the file changed on disk; raises and keeps the old types if invalid."""
+        self._set_allowed_types(self._read_allowed_types(path))
+        # Rebuild the plan here so the next order event does not pay for it
+        self.replication_plan()
+        log_success(f"Allowed order types reloaded: {self.allowed_types}")
+
+    @staticmethod
+    def _read_allowed_types(path):
+        with open(path, 'r') as f:
+            allowed_types = json.load(f)[0]
+        for field in ('order_types', 'product_types'):
+            values = allowed_types.get(field)
+            if not isinstance(values, list) or not all(isinstance(value, str) for value in values):
+                raise ValueError(f"{field} must be a list of strings")
+        return allowed_types
+
+    def _set_allowed_types(self, allowed_types):
+        with self._plan_lock:
+            self._allowed = (self._allowed[0] + 1, allowed_types)
+
     def is_order_allowed(self, order):
         """Check if an order type is allowed for replication."""
         self._ensure_initialized()
-        return (
-            order.get('order_type') in self.allowed_types['order_types'] and
-            order.get('product') in self.allowed_types['product_types']
-        )
+        return self.replication_plan().allows(order)
+
+    def replication_plan(self):
+        """Return the current ReplicationPlan, rebuilding it only if accounts or allowed types changed."""
+        # Version and accounts come from one registry snapshot, so they always agree
+        accounts = self.kite_service.registry.snapshot()
+        allowed_version, allowed_types = self._allowed
+        version = (accounts.version, allowed_version)
+        plan = self._plan
+        if plan is not None and plan.version == version:
+            return plan
+        with self._plan_lock:
+            if self._plan is None or self._plan.version != version:
+                started = time.perf_counter()
+                self._plan = ReplicationPlan.build(
+                    version,
+                    accounts.accounts,
+                    allowed_types,
+                    self.kite_service.get_kite_instance
+                )
+                metrics.histogram(
+                    'replication_plan_build_seconds', 'Time to rebuild the replication plan'
+                ).record(time.perf_counter() - started)
+                log_info(
+                    f"Replication plan built: primary {self._plan.primary_id}, "
+                    f"{len(self._plan.followers)} followers"
+                )
+            return self._plan
 
     def start_replication(self):
         """Start trade replication."""
@@ -56,11 +152,9 @@ class TradeCopier:
         if not self.is_replicating:
             return
 
-        if not self.is_order_allowed(order):
-            log_info(f"Order {order.get('order_id')} skipped - type not allowed")
-            return
-
-        primary_account = self.kite_service.get_primary_account()
+        received = time.perf_counter()
+        plan = self.replication_plan()
+        primary_account = plan.primary_id
         if not primary_account:
             log_error("No primary account found")
             return
@@ -69,48 +163,143 @@ class TradeCopier:
         if order.get('account_id') != primary_account:
             return
 
-        # Replicate to other accounts
-        for account_id, account in self.kite_service.accounts.items():
-            if account_id == primary_account:
-                continue
-
-            # Scale quantity based on multiplier
-            quantity = int(order.get('quantity', 0) * account.get('ps_multiplier', 1.0))
-            if quantity == 0:
-                continue
-
-            # Prepare order parameters
-            order_params = {
-                'tradingsymbol': order.get('tradingsymbol'),
-                'exchange': order.get('exchange'),
-                'transaction_type': order.get('transaction_type'),
-                'quantity': quantity,
-                'order_type': order.get('order_type'),
-                'product': order.get('product'),
-                'price': order.get('price', 0)
-            }
-
-            # Add trigger price for SL orders
-            if order.get('order_type') == 'SL':
-                order_params['trigger_price'] = order.get('trigger_price')
-
-            # Retry logic
-            max_retries = 2
-            for attempt in range(max_retries + 1):
-                try:
-                    # order_id = self.kite_service.place_order(account_id, order_params)
-                    order_id=1
-                    if order_id:
-                        log_success(
-                            f"Order {order.get('order_id')} replicated to {account_id} "
-                            f"as {order_id}"
-                        )
-                        break
-                except Exception as e:
-                    if attempt == max_retries:
-                        log_error(
-                            f"Failed to replicate order {order.get('order_id')} "
-                            f"to {account_id} after {max_retries} attempts: {str(e)}"
-                        )
-                    else:
-                        time.sleep(1)  # Wait before retry 
\ No newline at end of file
+        # Skip resent events, e.g. after a ticker reconnect
+        if not self.seen_events.first_seen(order):
+            log_info(f"Order {order.get('order_id')} {order.get('status')} event already handled - skipped")
+            return
+
+        trade = order_to_trade(primary_account, order) if order.get('status') == 'COMPLETE' else None
+        if trade:
+            self._publish_trade(trade)
+        results = self._replicate(plan, order, received)
+        # Journal after the fan-out so follower orders never wait on the disk write
+        if self.trade_journal:
+            self.trade_journal.record_order_event(primary_account, order, trade)
+        return results
+
+    def _replicate(self, plan, order, received):
+        """Send the follower copies of a primary order event; returns the fan-out results, or None."""
+        # Replicate only on the transition that matters, not on every update
+        status = order.get('status')
+        if status == 'COMPLETE':
+            as_market = True
+        elif status in self.PLACEMENT_STATUSES and order.get('order_type') != 'MARKET':
+            as_market = False
+        else:
+            return None
+
+        if not plan.allows(order):
+            log_info(f"Order {order.get('order_id')} skipped - type not allowed")
+            return None
+
+        # A LIMIT order copied when placed must not be copied again when it fills
+        if not self.replicated_orders.first_seen(order):
+            return None
+
+        # Build one order per follower account
+        jobs = plan.follower_orders(order, as_market=as_market)
+        if not jobs:
+            return None
+
+        # Send to all followers at once
+        fan_out_started = time.perf_counter()
+        metrics.histogram(
+            'replication_dispatch_seconds', 'Primary event receipt to follower fan-out start'
+        ).record(fan_out_started - received)
+        params_by_account = dict(jobs)
+        dispatch_seconds = fan_out_started - received
+        results = self.fan_out.run(
+            jobs,
+            lambda account_id, order_params: self._timed_send(plan, account_id, order_params),
+            # An attempt in flight at the deadline can still land; record that order rather than lose it
+            on_late=lambda result: self._handle_result(order, params_by_account, result, dispatch_seconds, late=True)
+        )
+        for result in results:
+            self._handle_result(order, params_by_account, result, dispatch_seconds)
+        return results
+
+    def _handle_result(self, order, params_by_account, result, dispatch_seconds, late=False):
+        """Record, publish and log one follower's replication result."""
+        self._record_result(result, dispatch_seconds)
+        # Only a MARKET copy executes right away; a resting copy shows up in the follower's order book once it fills.
+        # A dry run executed nothing, so it stays in the replication log and never reaches the stream.
+        params = params_by_account[result['account_id']]
+        if result['status'] == 'success' and params['order_type'] == 'MARKET' and not self.dry_run:
+            # Live notice only; the journaled trade comes from the follower's order book with its real fill
+            self._publish_trade({
+                'trade_id': result['order_id'],
+                'account_id': result['account_id'],
+                'symbol': order.get('tradingsymbol'),
+                'quantity': params['quantity'],
+                'price': order.get('average_price', order.get('price', 0)),
+                'order_type': params['order_type'],
+                'product_type': order.get('product'),
+                'timestamp': str(order.get('order_timestamp', ''))
+            })
+        if self.trade_journal:
+            self.trade_journal.record_replication(order.get('order_id'), result)
+
+        if result['status'] == 'unknown':
+            log_error(
+                f"Outcome of replicating order {order.get('order_id')} to {result['account_id']} is unknown "
+                f"and it was not resent; check the account's order book: {result['error']}"
+            )
+        elif late:
+            log_warning(
+                f"Order {order.get('order_id')} reached {result['account_id']} as {result['order_id']} "
+                f"after it was reported as timed out ({result['latency_ms']}ms)"
+            )
+        elif result['status'] == 'success':
+            log_success(
+                f"Order {order.get('order_id')} replicated to {result['account_id']} "
+                f"as {result['order_id']} in {result['latency_ms']}ms "
+                f"(attempts: {result['attempts']}){' - dry run, not sent' if self.dry_run else ''}"
+            )
+        elif result['status'] == 'timeout':
+            log_error(
+                f"Timed out replicating order {order.get('order_id')} "
+                f"to {result['account_id']} after {result['latency_ms']}ms"
+            )
+        else:
+            log_error(
+                f"Failed to replicate order {order.get('order_id')} "
+                f"to {result['account_id']} after {result['attempts']} attempts: {result['error']}"
+            )
+
+    def _publish_trade(self, trade):
+        """Push a trade to live stream subscribers."""
+        if self.trade_bus:
+            self.trade_bus.publish(trade)
+
+    def _timed_send(self, plan, account_id, order_params):
+        """Send one attempt and record its send-to-ack time for the account."""
+        sent = time.perf_counter()
+        try:
+            return self._send_order(plan, account_id, order_params)
+        finally:
+            metrics.histogram(
+                'replication_send_seconds', 'Follower order send to broker ack, per attempt', account=account_id
+            ).record(time.perf_counter() - sent)
+
+    @staticmethod
+    def _record_result(result, dispatch_seconds):
+        """Record a follower's end-to-end latency (primary event receipt to ack), outcome and retries."""
+        account_id = result['account_id']
+        metrics.counter(
+            'replication_results_total', 'Follower replication outcomes', account=account_id, status=result['status']
+        ).inc()
+        if result['attempts'] and result['attempts'] > 1:
+            metrics.counter(
+                'replication_retries_total', 'Follower order retries', account=account_id
+            ).inc(result['attempts'] - 1)
+        if result['status'] == 'success':
+            metrics.histogram(
+                'replication_latency_seconds', 'Primary event receipt to follower order ack', account=account_id
+            ).record(dispatch_seconds + result['latency_ms'] / 1000)
+
+    def _send_order(self, plan, account_id, order_params):
+        """Place a follower order with the plan's resolved client; returns the order id or None."""
+        if self.dry_run:
+            # No order reaches the broker; a unique id keeps replication log entries distinct
+            return f"dry-{uuid.uuid4().hex[:12]}"
+        return self.kite_service.place_order(account_id, order_params, kite=plan.clients[account_id])
@@ -0,0 +1,12 @@
+def order_to_trade(account_id, order):
+    """Convert a Kite order into the trade format expected by the frontend."""
+    return {
+        "trade_id": order["order_id"],
+        "account_id": account_id,
+        "symbol": order["tradingsymbol"],
+        "quantity": order["quantity"],
+        "price": order["average_price"],
+        "order_type": order["order_type"],
+        "product_type": order["product"],
+        "timestamp": str(order["order_timestamp"]),
+    }
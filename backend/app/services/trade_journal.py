@@ -0,0 +1,188 @@
+import json
+import sqlite3
+import threading
+import time
+from flask import current_app
+from ..utils.logger import log_info, log_error
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS order_events (
+    id INTEGER PRIMARY KEY,
+    account_id TEXT NOT NULL,
+    order_id TEXT NOT NULL,
+    status TEXT,
+    received_at REAL NOT NULL,
+    payload TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_order_events_order ON order_events (order_id);
+
+CREATE TABLE IF NOT EXISTS replications (
+    id INTEGER PRIMARY KEY,
+    primary_order_id TEXT NOT NULL,
+    account_id TEXT NOT NULL,
+    follower_order_id TEXT,
+    status TEXT NOT NULL,
+    attempts INTEGER,
+    latency_ms REAL,
+    error TEXT,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_replications_primary ON replications (primary_order_id);
+CREATE INDEX IF NOT EXISTS idx_replications_account ON replications (account_id, created_at);
+
+CREATE TABLE IF NOT EXISTS trades (
+    trade_id TEXT NOT NULL,
+    account_id TEXT NOT NULL,
+    symbol TEXT,
+    quantity INTEGER,
+    price REAL,
+    order_type TEXT,
+    product_type TEXT,
+    timestamp TEXT NOT NULL,
+    source TEXT NOT NULL,
+    PRIMARY KEY (account_id, trade_id)
+);
+CREATE INDEX IF NOT EXISTS idx_trades_account_time ON trades (account_id, timestamp, trade_id);
+CREATE INDEX IF NOT EXISTS idx_trades_trade_id ON trades (trade_id);
+"""
+
+TRADE_COLUMNS = ('trade_id', 'account_id', 'symbol', 'quantity', 'price', 'order_type', 'product_type', 'timestamp')
+
+class TradeJournal:
+    """Durable, append-only record of order events, replication results and executed trades.
+
+    Backed by SQLite in WAL mode so readers never block the writer. Trades
+    come from the primary's fill events and from broker order-book
+    snapshots, never from follower order acks, and the first sighting wins.
+    This keeps history and export queries independent of the broker API and
+    survives restarts and the end of the trading day.
+    """
+
+    def __init__(self):
+        self.path = None
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+        self._initialized = False
+
+    def _ensure_initialized(self):
+        """Ensure the journal database exists, using the app's configured path."""
+        if not self._initialized:
+            with current_app.app_context():
+                self.path = current_app.config['TRADE_JOURNAL_PATH']
+                conn = self._connection()
+                conn.executescript(SCHEMA)
+                log_info(f"[TradeJournal] Journal ready at {self.path}")
+                self._initialized = True
+
+    def _connection(self):
+        """One connection per thread; SQLite connections are not shared across threads."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.row_factory = sqlite3.Row
+            self._local.conn = conn
+        return conn
+
+    def _write(self, statements):
+        """Run (sql, params) statements in one transaction."""
+        self._ensure_initialized()
+        with self._write_lock:
+            conn = self._connection()
+            try:
+                conn.execute('BEGIN')
+                for sql, params in statements:
+                    conn.execute(sql, params)
+                conn.execute('COMMIT')
+            except Exception as e:
+                # BEGIN itself can fail (e.g. database is locked), leaving nothing to roll back
+                if conn.in_transaction:
+                    conn.execute('ROLLBACK')
+                log_error(f"[TradeJournal] Write failed: {str(e)}")
+
+    def record_order_event(self, account_id, order, trade=None):
+        """Record an order event; `trade` (a frontend trade dict) is also recorded when the order executed."""
+        statements = [(
+            'INSERT INTO order_events (account_id, order_id, status, received_at, payload) VALUES (?, ?, ?, ?, ?)',
+            (account_id, str(order.get('order_id')), order.get('status'), time.time(), json.dumps(order, default=str))
+        )]
+        if trade:
+            statements.append(self._trade_insert(trade, 'primary'))
+        self._write(statements)
+
+    def record_replication(self, primary_order_id, result):
+        """
+        Record one follower's replication result.
+        - An ack only means Kite took the order; the follower's trade is recorded from its order book once it fills.
+        """
+        self._write([(
+            'INSERT INTO replications (primary_order_id, account_id, follower_order_id, status, attempts, '
+            'latency_ms, error, created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+            (str(primary_order_id), result['account_id'],
+             str(result['order_id']) if result.get('order_id') else None, result['status'],
+             result.get('attempts'), result.get('latency_ms'), result.get('error'), time.time())
+        )])
+
+    def record_trades(self, trades, source='snapshot'):
+        """Record executed trades seen elsewhere, e.g. in a broker order-book snapshot."""
+        self._write([self._trade_insert(trade, source) for trade in trades])
+
+    def trades_page(self, account_id, limit, after=None, filters=None):
+        """
+        Return up to `limit` trades for an account, newest first, strictly older than the `after` cursor.
+        - `after` is a (timestamp, trade_id) tuple taken from the last trade of the previous page.
+        - Returns (trades, next_cursor); next_cursor is None when there are no more trades.
+        """
+        self._ensure_initialized()
+        sql = f"SELECT {', '.join(TRADE_COLUMNS)} FROM trades WHERE account_id = ?"
+        params = [account_id]
+        if after:
+            sql += ' AND (timestamp, trade_id) < (?, ?)'
+            params.extend(after)
+        for field, value in (filters or {}).items():
+            if value and field in ('symbol', 'product_type', 'order_type'):
+                sql += f' AND {field} = ?'
+                params.append(value)
+        sql += ' ORDER BY timestamp DESC, trade_id DESC LIMIT ?'
+        params.append(limit + 1)
+
+        trades = [dict(row) for row in self._connection().execute(sql, params)]
+        if len(trades) <= limit:
+            return trades, None
+        trades = trades[:limit]
+        return trades, {'after_ts': trades[-1]['timestamp'], 'after_id': trades[-1]['trade_id']}
+
+    def count_trades(self, account_id):
+        self._ensure_initialized()
+        row = self._connection().execute('SELECT COUNT(*) FROM trades WHERE account_id = ?', (account_id,)).fetchone()
+        return row[0]
+
+    def get_trades(self, account_id, trade_ids):
+        """Return the account's trades with the given trade ids."""
+        self._ensure_initialized()
+        trade_ids = [str(trade_id) for trade_id in trade_ids]
+        if not trade_ids:
+            return []
+        placeholders = ', '.join('?' * len(trade_ids))
+        rows = self._connection().execute(
+            f"SELECT {', '.join(TRADE_COLUMNS)} FROM trades WHERE account_id = ? AND trade_id IN ({placeholders})",
+            [account_id, *trade_ids]
+        )
+        return [dict(row) for row in rows]
+
+    @staticmethod
+    def _trade_insert(trade, source):
+        # First sighting wins, except that a broker snapshot corrects rows written from a replication ack
+        # by earlier versions, which carried the primary's price and order type
+        return (
+            'INSERT INTO trades (trade_id, account_id, symbol, quantity, price, order_type, '
+            'product_type, timestamp, source) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?) '
+            'ON CONFLICT (account_id, trade_id) DO UPDATE SET symbol = excluded.symbol, '
+            'quantity = excluded.quantity, price = excluded.price, order_type = excluded.order_type, '
+            'product_type = excluded.product_type, timestamp = excluded.timestamp, source = excluded.source '
+            "WHERE trades.source = 'replication' AND excluded.source = 'snapshot'",
+            (str(trade['trade_id']), trade['account_id'], trade.get('symbol'), trade.get('quantity'),
+             trade.get('price'), trade.get('order_type'), trade.get('product_type'),
+             str(trade.get('timestamp', '')), source)
+        )
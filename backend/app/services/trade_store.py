@@ -0,0 +1,65 @@
+import json
+import threading
+
+class TradeRecord:
+    """One trade in the store; slots keep each record small."""
+
+    __slots__ = ('seq', 'trade_id', 'account_id', 'symbol', 'quantity', 'price',
+                 'order_type', 'product_type', 'timestamp')
+
+    FIELDS = __slots__[1:]
+
+    def __init__(self, seq, trade):
+        self.seq = seq
+        for field in self.FIELDS:
+            setattr(self, field, trade.get(field))
+
+    def to_dict(self):
+        return {field: getattr(self, field) for field in self.__slots__}
+
+class TradeStore:
+    """Fixed-capacity ring buffer of recent trades.
+
+    Appends are O(1) and overwrite the oldest record once the store is full.
+    Every record gets an increasing sequence number, so readers can ask for
+    everything "since sequence N" without scanning.
+    """
+
+    def __init__(self, capacity=5000):
+        self.capacity = capacity
+        self._records = [None] * capacity
+        self._next_seq = 1
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return min(self._next_seq - 1, self.capacity)
+
+    def append(self, trade):
+        """Store a trade dict and return its TradeRecord."""
+        with self._lock:
+            record = TradeRecord(self._next_seq, trade)
+            self._records[(record.seq - 1) % self.capacity] = record
+            self._next_seq += 1
+        return record
+
+    def since(self, seq=0, limit=None):
+        """Yield records with a sequence number greater than seq, oldest first."""
+        with self._lock:
+            start = max(seq + 1, self._next_seq - self.capacity, 1)
+            end = self._next_seq
+        if limit is not None:
+            end = min(end, start + limit)
+        for current in range(start, end):
+            record = self._records[(current - 1) % self.capacity]
+            # Skip slots overwritten by appends made while we were reading
+            if record is not None and record.seq == current:
+                yield record
+
+    def to_json(self, since=0, limit=None):
+        """Yield a JSON array of trades chunk by chunk instead of building it in memory."""
+        yield '['
+        first = True
+        for record in self.since(since, limit):
+            yield json.dumps(record.to_dict()) if first else ',' + json.dumps(record.to_dict())
+            first = False
+        yield ']'
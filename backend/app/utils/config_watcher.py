@@ -0,0 +1,52 @@
+import os
+import threading
+from .logger import log_info, log_error
+
+def _signature(path):
+    """(inode, size, mtime) of a file, or None if it does not exist; an editor's rename changes the inode."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_ino, st.st_size, st.st_mtime_ns)
+
+class ConfigWatcher:
+    """Polls config files and calls back when one changes on disk.
+
+    One daemon thread serves every watched file; it starts with the first
+    watch(). Callbacks run on that thread, so order handling never waits on
+    a reload. A callback that raises leaves the previous config in place.
+    """
+
+    def __init__(self, poll_interval=1.0):
+        self.poll_interval = poll_interval
+        self._watches = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def watch(self, path, on_change):
+        """Call on_change(path) whenever path changes after this call."""
+        with self._lock:
+            self._watches[path] = [_signature(path), on_change]
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='config-watcher', daemon=True)
+                self._thread.start()
+        log_info(f"[ConfigWatcher] Watching {os.path.basename(path)}")
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.wait(self.poll_interval):
+            with self._lock:
+                watches = list(self._watches.items())
+            for path, watch in watches:
+                signature = _signature(path)
+                if signature is None or signature == watch[0]:
+                    continue
+                watch[0] = signature
+                try:
+                    watch[1](path)
+                except Exception as e:
+                    log_error(f"[ConfigWatcher] Reload of {os.path.basename(path)} failed, keeping current config: {str(e)}")
@@ -0,0 +1,77 @@
+from collections import defaultdict, deque
+import itertools
+import logging
+import re
+import threading
+
+SOURCE_TAG = re.compile(r'^(?:SUCCESS: )?\[([^\]]+)\]')
+
+def source_tag(message):
+    """Return the "[Source]" tag a message starts with (without brackets), or None."""
+    match = SOURCE_TAG.match(message)
+    return match.group(1) if match else None
+
+class LogIndex(logging.Handler):
+    """Keep recent log records in memory, indexed by level and by source tag.
+
+    Records are stored already parsed, so filtered history queries never touch
+    the log file. Each index is a bounded deque, so memory stays fixed.
+    """
+
+    def __init__(self, capacity=5000):
+        super().__init__()
+        self.capacity = capacity
+        self._seq = itertools.count(1)
+        self._all = deque(maxlen=capacity)
+        self._by_level = defaultdict(lambda: deque(maxlen=capacity))
+        self._by_source = defaultdict(lambda: deque(maxlen=capacity))
+        self._index_lock = threading.Lock()
+        self._formatter = logging.Formatter()
+
+    def emit(self, record):
+        try:
+            message = record.getMessage()
+            if record.exc_info:
+                message = f"{message}\n{self._formatter.formatException(record.exc_info)}"
+            log_entry = {
+                'seq': next(self._seq),
+                'timestamp': self._formatter.formatTime(record),
+                'level': record.levelname,
+                'source': source_tag(message),
+                'message': message
+            }
+            with self._index_lock:
+                self._all.append(log_entry)
+                self._by_level[log_entry['level']].append(log_entry)
+                if log_entry['source']:
+                    self._by_source[log_entry['source']].append(log_entry)
+        except Exception:
+            self.handleError(record)
+
+    def query(self, level=None, source=None, limit=100):
+        """Return up to `limit` of the newest matching records, oldest first."""
+        if level:
+            level = level.upper()
+        if source:
+            source = source.strip('[]')
+        with self._index_lock:
+            if level and source:
+                by_level = self._by_level.get(level, ())
+                by_source = self._by_source.get(source, ())
+                candidates = by_level if len(by_level) <= len(by_source) else by_source
+            elif level:
+                candidates = self._by_level.get(level, ())
+            elif source:
+                candidates = self._by_source.get(source, ())
+            else:
+                candidates = self._all
+
+            matches = []
+            for log_entry in reversed(candidates):
+                if (not level or log_entry['level'] == level) and (not source or log_entry['source'] == source):
+                    matches.append(log_entry)
+                    if len(matches) == limit:
+                        break
+        matches.reverse()
+        return matches
+
@@ -0,0 +1,119 @@
+import json
+import os
+import re
+from .log_index import source_tag
+
+BLOCK_SIZE = 8192
+
+TEXT_LINE = re.compile(r'^(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2},\d{3}) - ([A-Z]+) - (.*)$')
+
+def parse_log_line(line):
+    """
+    Parse one log line into a dict, or None if it does not start a record.
+    - JSON lines (LOG_FORMAT "json") and "timestamp - level - message" text lines are both accepted.
+    - Text continuation lines, e.g. traceback frames, return None.
+    """
+    line = line.strip()
+    if line.startswith('{'):
+        try:
+            log_entry = json.loads(line)
+        except ValueError:
+            return None
+        if not isinstance(log_entry, dict) or 'message' not in log_entry:
+            return None
+        return log_entry
+
+    match = TEXT_LINE.match(line)
+    if not match:
+        return None
+    timestamp, level, message = match.groups()
+    return {
+        'timestamp': timestamp,
+        'level': level,
+        'source': source_tag(message),
+        'message': message
+    }
+
+def parse_log_lines(lines):
+    """Parse lines (oldest first) into entries, folding text continuation lines into the record above them."""
+    logs = []
+    for line in lines:
+        log_entry = parse_log_line(line)
+        if log_entry:
+            logs.append(log_entry)
+        elif logs and line.strip():
+            logs[-1]['message'] += '\n' + line.rstrip()
+    return logs
+
+def log_files(log_file):
+    """Return the active log file followed by its rotated backups (app.log.1, app.log.2, ...)."""
+    files = [log_file]
+    index = 1
+    while os.path.exists(f"{log_file}.{index}"):
+        files.append(f"{log_file}.{index}")
+        index += 1
+    return files
+
+def read_lines_reverse(path, end=None):
+    """
+    Yield (offset, line) for each non-empty line of a file, last line first.
+    - Reads fixed-size blocks backwards from the end, so only the lines consumed are ever read.
+    - `end` limits reading to the bytes before that offset; `offset` is where each line starts.
+    """
+    with open(path, 'rb') as f:
+        f.seek(0, os.SEEK_END)
+        position = f.tell() if end is None else min(end, f.tell())
+        buffer = b''
+        buffer_end = position
+        while position > 0:
+            read_size = min(BLOCK_SIZE, position)
+            position -= read_size
+            f.seek(position)
+            buffer = f.read(read_size) + buffer
+            lines = buffer.split(b'\n')
+            # The first piece may be the tail of a line that starts in an earlier block
+            buffer = lines[0]
+            line_end = buffer_end
+            for line in reversed(lines[1:]):
+                line_start = line_end - len(line)
+                if line.strip():
+                    yield line_start, line.decode('utf-8', errors='replace')
+                line_end = line_start - 1
+            buffer_end = position + len(buffer)
+        if buffer.strip():
+            yield 0, buffer.decode('utf-8', errors='replace')
+
+def read_log_tail(log_file, lines=100, before=None):
+    """
+    Read the last `lines` lines across the active log and its rotated backups.
+    - `before` is a cursor from a previous call ("<inode>:<offset>") to page further back. Rotation
+      renames files, so the cursor names the file by inode and stays valid when app.log becomes app.log.1.
+    - Returns (lines oldest first, cursor for the next older page or None when nothing is left).
+    - Raises ValueError for a malformed cursor.
+    """
+    files = log_files(log_file)
+    index, end = 0, None
+    if before:
+        inode, _, offset = before.partition(':')
+        inode, end = int(inode), int(offset) if offset else None
+        # A file rotated past the last backup is gone; there is nothing older to read
+        index = next((i for i, path in enumerate(files) if _inode(path) == inode), len(files))
+
+    collected = []
+    while index < len(files):
+        inode = _inode(files[index])
+        for offset, line in read_lines_reverse(files[index], end):
+            collected.append(line)
+            if len(collected) == lines:
+                collected.reverse()
+                return collected, f"{inode}:{offset}"
+        index, end = index + 1, None
+
+    collected.reverse()
+    return collected, None
+
+def _inode(path):
+    try:
+        return os.stat(path).st_ino
+    except FileNotFoundError:
+        return None
@@ -0,0 +1,119 @@
+import ctypes
+import ctypes.util
+import os
+import select
+import sys
+import threading
+import time
+from flask import current_app
+from .log_reader import parse_log_line
+from .pubsub import PubSub
+
+# inotify event masks (see inotify(7))
+IN_MODIFY = 0x00000002
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+
+def _inotify_fd(directory):
+    """Return a non-blocking inotify fd watching directory, or None where inotify is unavailable."""
+    if not sys.platform.startswith('linux'):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+        fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if fd < 0:
+            return None
+        if libc.inotify_add_watch(fd, directory.encode(), IN_MODIFY | IN_MOVED_TO | IN_CREATE) < 0:
+            os.close(fd)
+            return None
+        return fd
+    except (OSError, AttributeError):
+        return None
+
+class LogTailer:
+    """Single shared reader that follows the log file and broadcasts parsed entries.
+
+    The reader thread starts with the first subscriber. It wakes on inotify
+    events where available and polls otherwise. When RotatingFileHandler rolls
+    the file (new inode, or the file shrinks) it finishes the old file and
+    reopens the new one from the start.
+    """
+
+    def __init__(self, queue_size=256, poll_interval=0.25):
+        self.poll_interval = poll_interval
+        self.log_file = None
+        self._pubsub = PubSub(queue_size)
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def _ensure_started(self):
+        """Start the reader thread once, using the app's log file path."""
+        with self._lock:
+            if self._thread is None:
+                self.log_file = current_app.config['LOG_FILE']
+                self._thread = threading.Thread(target=self._run, name='log-tailer', daemon=True)
+                self._thread.start()
+
+    def subscribe(self):
+        self._ensure_started()
+        return self._pubsub.subscribe()
+
+    def unsubscribe(self, subscription):
+        self._pubsub.unsubscribe(subscription)
+
+    def _run(self):
+        inotify = _inotify_fd(os.path.dirname(self.log_file))
+        f, inode = self._open(at_end=True)
+        partial = b''
+        while True:
+            if f:
+                partial = self._drain(f, partial)
+                if self._rotated(f, inode):
+                    # Pick up anything written to the old file before it was rolled
+                    partial = self._drain(f, partial)
+                    f.close()
+                    f, inode = self._open(at_end=False)
+                    partial = b''
+                    continue
+            else:
+                f, inode = self._open(at_end=False)
+            self._wait(inotify)
+
+    def _open(self, at_end):
+        try:
+            f = open(self.log_file, 'rb')
+        except OSError:
+            return None, None
+        if at_end:
+            f.seek(0, os.SEEK_END)
+        return f, os.fstat(f.fileno()).st_ino
+
+    def _drain(self, f, partial):
+        """Publish every complete line available; return any trailing partial line."""
+        for line in iter(f.readline, b''):
+            if not line.endswith(b'\n'):
+                return partial + line
+            log_entry = parse_log_line((partial + line).decode('utf-8', errors='replace'))
+            partial = b''
+            if log_entry:
+                self._pubsub.publish(log_entry)
+        return partial
+
+    def _rotated(self, f, inode):
+        try:
+            stat = os.stat(self.log_file)
+        except OSError:
+            return True
+        return stat.st_ino != inode or stat.st_size < f.tell()
+
+    def _wait(self, inotify):
+        if inotify is None:
+            time.sleep(self.poll_interval)
+            return
+        # The timeout is a safety net in case an event is missed
+        ready, _, _ = select.select([inotify], [], [], 1.0)
+        if ready:
+            try:
+                os.read(inotify, 4096)
+            except BlockingIOError:
+                pass
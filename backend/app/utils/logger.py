@@ -1,11 +1,69 @@
+import atexit
+import json
 import logging
-from logging.handlers import RotatingFileHandler
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 import os
+import queue
 from flask import current_app
+from .log_index import LogIndex, source_tag
+from .metrics import metrics
+
+# Cached once; log_* helpers are called on the order hot path
+_logger = logging.getLogger('trade_monitor')
+
+# Recent records, indexed by level and source for /api/logs/history filters
+log_index = LogIndex()
+
+class BoundedQueueHandler(QueueHandler):
+    """QueueHandler that never blocks the caller.
+
+    When the queue is full the record is dropped ("drop_newest") or the
+    oldest queued record is discarded to make room ("drop_oldest").
+    """
+
+    def __init__(self, log_queue, overflow_policy='drop_newest'):
+        super().__init__(log_queue)
+        self.overflow_policy = overflow_policy
+        self.dropped = metrics.counter('log_records_dropped_total', 'Log records dropped because the log queue was full')
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+            return
+        except queue.Full:
+            pass
+        if self.overflow_policy == 'drop_oldest':
+            try:
+                self.queue.get_nowait()
+                self.queue.put_nowait(record)
+            except (queue.Empty, queue.Full):
+                pass
+        self.dropped.inc()
+
+class JsonFormatter(logging.Formatter):
+    """Format each record as one JSON object per line.
+
+    Multi-line messages such as tracebacks stay inside a single line, so
+    readers never have to stitch continuation lines back together.
+    """
+
+    def format(self, record):
+        message = record.getMessage()
+        if record.exc_info:
+            message = f"{message}\n{self.formatException(record.exc_info)}"
+        return json.dumps({
+            'timestamp': self.formatTime(record),
+            'level': record.levelname,
+            'source': source_tag(message),
+            'message': message
+        })
 
 def setup_logger():
-    """Configure and return a logger instance."""
-    logger = logging.getLogger('trade_monitor')
+    """
+    Configure and return a logger instance.
+    - With LOG_ASYNC, callers only enqueue records; a QueueListener thread does the file and console I/O.
+    """
+    logger = _logger
     logger.setLevel(logging.INFO)
 
     if not logger.handlers:  # Only add handlers if none exist
@@ -13,38 +71,50 @@ def setup_logger():
             '%(asctime)s - %(levelname)s - %(message)s'
         )
 
-        # File handler
+        # File handler; JSON lines if LOG_FORMAT is "json"
         file_handler = RotatingFileHandler(
             current_app.config['LOG_FILE'],
             maxBytes=1024 * 1024,  # 1MB
             backupCount=5
         )
-        file_handler.setFormatter(formatter)
-        logger.addHandler(file_handler)
+        if current_app.config.get('LOG_FORMAT', 'text') == 'json':
+            file_handler.setFormatter(JsonFormatter())
+        else:
+            file_handler.setFormatter(formatter)
 
         # Console handler
         console_handler = logging.StreamHandler()
         console_handler.setFormatter(formatter)
-        logger.addHandler(console_handler)
+
+        handlers = [file_handler, log_index, console_handler]
+        if current_app.config.get('LOG_ASYNC', True):
+            queue_handler = BoundedQueueHandler(
+                queue.Queue(current_app.config.get('LOG_QUEUE_SIZE', 10000)),
+                current_app.config.get('LOG_OVERFLOW_POLICY', 'drop_newest')
+            )
+            listener = QueueListener(queue_handler.queue, *handlers)
+            listener.start()
+            # Flush whatever is still queued when the process exits
+            atexit.register(listener.stop)
+            logger.addHandler(queue_handler)
+        else:
+            for handler in handlers:
+                logger.addHandler(handler)
 
     return logger
 
 def log_info(message):
     """Log an info message."""
-    logger = logging.getLogger('trade_monitor')
-    logger.info(message)
+    _logger.info(message)
 
 def log_warning(message):
     """Log a warning message."""
-    logger = logging.getLogger('trade_monitor')
-    logger.warning(message)
+    _logger.warning(message)
 
 def log_error(message):
     """Log an error message."""
-    logger = logging.getLogger('trade_monitor')
-    logger.error(message)
+    _logger.error(message)
 
 def log_success(message):
     """Log a success message."""
-    logger = logging.getLogger('trade_monitor')
-    logger.info(f"SUCCESS: {message}")
\ No newline at end of file
+    _logger.info(f"SUCCESS: {message}")
\ No newline at end of file
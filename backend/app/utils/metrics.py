@@ -0,0 +1,152 @@
+import math
+import threading
+
+# Sub-buckets per power of two; 2**4 keeps every recorded value within ~6% of its true value
+SUB_BUCKET_BITS = 4
+SUB_BUCKETS = 1 << SUB_BUCKET_BITS
+SUMMARY_QUANTILES = (0.5, 0.9, 0.99, 0.999)
+
+class Histogram:
+    """HDR-style latency histogram with constant memory and O(1) record().
+
+    Values are recorded in microseconds into log-linear buckets: each power
+    of two is split into SUB_BUCKETS equal slots, so relative precision is
+    the same from 50us to 50s and no samples are kept.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = {}
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def record(self, seconds):
+        micros = max(int(seconds * 1_000_000), 0)
+        index = self._index(micros)
+        with self._lock:
+            self._counts[index] = self._counts.get(index, 0) + 1
+            self.count += 1
+            self.sum += seconds
+            if seconds > self.max:
+                self.max = seconds
+
+    def quantile(self, q):
+        """Return the value (seconds) at quantile q, to bucket precision."""
+        with self._lock:
+            if not self.count:
+                return 0.0
+            rank = max(math.ceil(q * self.count), 1)
+            seen = 0
+            for index in sorted(self._counts):
+                seen += self._counts[index]
+                if seen >= rank:
+                    return min(self._upper(index) / 1_000_000, self.max)
+            return self.max
+
+    def snapshot(self):
+        quantiles = {q: self.quantile(q) for q in SUMMARY_QUANTILES}
+        with self._lock:
+            return {'count': self.count, 'sum': self.sum, 'max': self.max, 'quantiles': quantiles}
+
+    @staticmethod
+    def _index(micros):
+        if micros < SUB_BUCKETS:
+            return micros
+        shift = micros.bit_length() - SUB_BUCKET_BITS - 1
+        return ((shift + 1) << SUB_BUCKET_BITS) + ((micros >> shift) - SUB_BUCKETS)
+
+    @staticmethod
+    def _upper(index):
+        """Largest value (microseconds) that falls into bucket index."""
+        if index < SUB_BUCKETS:
+            return index
+        shift = (index >> SUB_BUCKET_BITS) - 1
+        return ((SUB_BUCKETS + (index & (SUB_BUCKETS - 1)) + 1) << shift) - 1
+
+class Counter:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.value = 0
+
+    def inc(self, amount=1):
+        with self._lock:
+            self.value += amount
+
+class MetricsRegistry:
+    """Named, labelled histograms and counters, rendered as Prometheus text or a JSON summary."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._metrics = {}
+        self._help = {}
+
+    def histogram(self, name, help_text='', **labels):
+        return self._get(Histogram, name, help_text, labels)
+
+    def counter(self, name, help_text='', **labels):
+        return self._get(Counter, name, help_text, labels)
+
+    def _get(self, kind, name, help_text, labels):
+        key = (name, tuple(sorted(labels.items())))
+        metric = self._metrics.get(key)
+        if metric is None:
+            with self._lock:
+                metric = self._metrics.get(key)
+                if metric is None:
+                    metric = self._metrics[key] = kind()
+                    self._help.setdefault(name, (kind, help_text))
+        return metric
+
+    def _grouped(self):
+        with self._lock:
+            items = sorted(self._metrics.items(), key=lambda item: item[0])
+        groups = {}
+        for (name, labels), metric in items:
+            groups.setdefault(name, []).append((labels, metric))
+        return groups
+
+    def to_prometheus(self):
+        """Render every metric in the Prometheus text exposition format; histograms become summaries."""
+        lines = []
+        for name, series in self._grouped().items():
+            kind, help_text = self._help[name]
+            if help_text:
+                lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {'summary' if kind is Histogram else 'counter'}")
+            for labels, metric in series:
+                if kind is Counter:
+                    lines.append(f"{name}{_labels(labels)} {metric.value}")
+                    continue
+                snapshot = metric.snapshot()
+                for q, value in snapshot['quantiles'].items():
+                    lines.append(f"{name}{_labels(labels + (('quantile', str(q)),))} {value:.6f}")
+                lines.append(f"{name}_sum{_labels(labels)} {snapshot['sum']:.6f}")
+                lines.append(f"{name}_count{_labels(labels)} {snapshot['count']}")
+        return '\n'.join(lines) + '\n'
+
+    def summary(self):
+        """JSON-friendly view: {name: [{labels, count, p50_ms, p90_ms, p99_ms, p999_ms, max_ms} | {labels, value}]}."""
+        result = {}
+        for name, series in self._grouped().items():
+            entries = result[name] = []
+            for labels, metric in series:
+                if isinstance(metric, Counter):
+                    entries.append({'labels': dict(labels), 'value': metric.value})
+                    continue
+                snapshot = metric.snapshot()
+                entry = {'labels': dict(labels), 'count': snapshot['count'], 'max_ms': round(snapshot['max'] * 1000, 3)}
+                for q, value in snapshot['quantiles'].items():
+                    entry[f"p{str(q)[2:].ljust(2, '0')}_ms"] = round(value * 1000, 3)
+                entries.append(entry)
+        return result
+
+def _labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{key}="{_escape(value)}"' for key, value in labels) + '}'
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+metrics = MetricsRegistry()
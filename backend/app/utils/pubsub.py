@@ -0,0 +1,67 @@
+from collections import deque
+import threading
+
+class Subscription:
+    """Bounded mailbox for one subscriber.
+
+    When the subscriber falls behind, the oldest undelivered item is dropped
+    so a slow client can never make the publisher wait.
+    """
+
+    def __init__(self, maxsize):
+        self._items = deque(maxlen=maxsize)
+        self._ready = threading.Condition()
+        self._waker = None
+        self.dropped = 0
+
+    def set_waker(self, waker):
+        """Call waker() after every put; lets an event loop wait without tying up a thread."""
+        self._waker = waker
+
+    def put(self, item):
+        with self._ready:
+            if len(self._items) == self._items.maxlen:
+                self.dropped += 1
+            self._items.append(item)
+            self._ready.notify()
+        if self._waker:
+            self._waker()
+
+    def get_nowait(self):
+        """Return the next item, or None if there is none."""
+        with self._ready:
+            return self._items.popleft() if self._items else None
+
+    def get(self, timeout=None):
+        """Return the next item, or None if nothing arrives within timeout seconds."""
+        with self._ready:
+            if not self._items:
+                self._ready.wait(timeout)
+            if not self._items:
+                return None
+            return self._items.popleft()
+
+class PubSub:
+    """Fan out published items to every current subscriber."""
+
+    def __init__(self, queue_size=256):
+        self.queue_size = queue_size
+        self._subscribers = set()
+        self._lock = threading.Lock()
+
+    def subscribe(self):
+        subscription = Subscription(self.queue_size)
+        with self._lock:
+            self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    def publish(self, item):
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for subscription in subscribers:
+            subscription.put(item)
+
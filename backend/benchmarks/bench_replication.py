@@ -0,0 +1,188 @@
+"""Replication benchmark against the simulated broker in fake_kite.
+
+Drives bursts of primary fills through the real ticker -> TradeCopier ->
+fan-out -> KiteService.place_order path for each follower count and
+reports throughput, fan-out latency percentiles and memory.
+
+    cd backend
+    python -m benchmarks.bench_replication --followers 1 10 50 200 --events 200
+"""
+import argparse
+import json
+import logging
+import os
+import resource
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import date, datetime
+from flask import Flask
+
+from app.services.kite_service import KiteService
+from app.services.trade_bus import TradeBus
+from app.services.trade_copier import TradeCopier
+from app.services.trade_journal import TradeJournal
+from app.services.trade_store import TradeStore
+from app.utils.metrics import Histogram
+from .fake_kite import FakeBroker, factories
+
+PRIMARY = 'PRIMARY'
+
+def write_config(directory, followers):
+    accounts = [{'account_id': PRIMARY, 'api_key': 'key-primary', 'secret_api_key': 'secret',
+                 'access_token': 'token', 'primary': True}]
+    accounts += [{'account_id': f'F{i:03d}', 'api_key': f'key-{i:03d}', 'secret_api_key': 'secret',
+                  'access_token': 'token', 'ps_multiplier': 1.0} for i in range(followers)]
+    files = {
+        'accounts_config.json': accounts,
+        'allowed_order_types.json': [{'order_types': ['MARKET', 'LIMIT', 'SL'], 'product_types': ['MIS', 'NRML']}],
+        'init_tracker.json': {'last_init_date': date.today().isoformat()}
+    }
+    for name, content in files.items():
+        with open(os.path.join(directory, name), 'w') as f:
+            json.dump(content, f)
+
+def make_app(directory, args):
+    app = Flask(__name__)
+    app.config.from_mapping(
+        ACCOUNTS_CONFIG_PATH=os.path.join(directory, 'accounts_config.json'),
+        ALLOWED_ORDER_TYPES_PATH=os.path.join(directory, 'allowed_order_types.json'),
+        INIT_TRACKER_PATH=os.path.join(directory, 'init_tracker.json'),
+        TRADE_JOURNAL_PATH=os.path.join(directory, 'trade_journal.db'),
+        REPLICATION_DRY_RUN=False,
+        REPLICATION_MAX_WORKERS=args.workers,
+        REPLICATION_ACCOUNT_TIMEOUT=args.timeout,
+        REPLICATION_MAX_RETRIES=args.retries,
+        REPLICATION_RETRY_BACKOFF=args.retry_backoff,
+        # The client-side scheduler runs at the simulated broker's limit
+        KITE_ORDER_RATE_LIMIT=args.rate_limit,
+        KITE_READ_RATE_LIMIT=args.rate_limit
+    )
+    return app
+
+def primary_fill(order_id, sequence):
+    return {
+        'order_id': order_id, 'account_id': PRIMARY, 'status': 'COMPLETE', 'filled_quantity': 1,
+        'tradingsymbol': f'SYM{sequence % 50}', 'exchange': 'NSE', 'transaction_type': 'BUY',
+        'order_type': 'MARKET', 'product': 'MIS', 'quantity': 1, 'price': 0, 'average_price': 100.0,
+        'order_timestamp': datetime.now()
+    }
+
+def run_scenario(followers, args):
+    directory = tempfile.mkdtemp(prefix='bench-replication-')
+    write_config(directory, followers)
+    broker = FakeBroker(latency_ms=args.latency_ms, jitter_ms=args.jitter_ms,
+                        error_rate=args.error_rate, rate_limit=args.rate_limit, seed=args.seed)
+    kite_factory, ticker_factory = factories(broker)
+    journal = TradeJournal()
+    kite_service = KiteService(journal, kite_factory=kite_factory, ticker_factory=ticker_factory)
+    copier = TradeCopier(kite_service, TradeBus(TradeStore()), journal)
+
+    per_order = Histogram()
+    per_event = Histogram()
+    outcomes = {'success': 0, 'failed': 0, 'unknown': 0, 'timeout': 0}
+
+    def on_order_update(order):
+        started = time.perf_counter()
+        results = copier.on_order_update(order) or []
+        per_event.record(time.perf_counter() - started)
+        for result in results:
+            outcomes[result['status']] += 1
+            per_order.record(result['latency_ms'] / 1000)
+
+    app = make_app(directory, args)
+    try:
+        with app.app_context():
+            copier._ensure_initialized()
+            copier.start_replication()
+            kite_service.start_ticker(PRIMARY, on_order_update)
+            # Let the supervisor take its first order snapshot
+            time.sleep(0.05)
+
+            if args.trace_memory:
+                tracemalloc.start()
+            started = time.perf_counter()
+            for sequence in range(args.events):
+                broker.emit('key-primary', primary_fill(broker.next_order_id(), sequence))
+                if args.burst and (sequence + 1) % args.burst == 0 and args.burst_gap_ms:
+                    time.sleep(args.burst_gap_ms / 1000)
+            # Updates are handled on dispatcher workers; wait until every one has been replicated
+            drain_deadline = time.perf_counter() + args.timeout * args.events
+            while per_event.count < args.events and time.perf_counter() < drain_deadline:
+                time.sleep(0.001)
+            elapsed = time.perf_counter() - started
+            heap_peak = tracemalloc.get_traced_memory()[1] if args.trace_memory else None
+            if args.trace_memory:
+                tracemalloc.stop()
+
+            kite_service.stop_ticker(PRIMARY)
+    finally:
+        copier.fan_out.shutdown()
+        kite_service._gather_executor.shutdown(wait=False)
+        shutil.rmtree(directory, ignore_errors=True)
+
+    return {
+        'followers': followers,
+        'events': args.events,
+        'follower_orders': sum(outcomes.values()),
+        **outcomes,
+        'rate_limited': broker.calls['rate_limited'],
+        'broker_errors': broker.calls['errors'],
+        'elapsed_s': round(elapsed, 3),
+        'events_per_s': round(args.events / elapsed, 1),
+        'orders_per_s': round(outcomes['success'] / elapsed, 1),
+        'fanout_p50_ms': round(per_event.quantile(0.5) * 1000, 2),
+        'fanout_p99_ms': round(per_event.quantile(0.99) * 1000, 2),
+        'order_p50_ms': round(per_order.quantile(0.5) * 1000, 2),
+        'order_p99_ms': round(per_order.quantile(0.99) * 1000, 2),
+        'heap_peak_mb': round(heap_peak / 2 ** 20, 2) if heap_peak is not None else None,
+        'max_rss_mb': round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+    }
+
+COLUMNS = ('followers', 'events', 'success', 'failed', 'unknown', 'timeout', 'rate_limited', 'events_per_s',
+           'orders_per_s', 'fanout_p50_ms', 'fanout_p99_ms', 'order_p50_ms', 'order_p99_ms',
+           'heap_peak_mb', 'max_rss_mb')
+
+def print_table(rows):
+    widths = [max(len(column), *(len(str(row[column])) for row in rows)) for column in COLUMNS]
+    print('  '.join(column.rjust(width) for column, width in zip(COLUMNS, widths)))
+    for row in rows:
+        print('  '.join(str(row[column]).rjust(width) for column, width in zip(COLUMNS, widths)))
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--followers', type=int, nargs='+', default=[1, 10, 50, 200])
+    parser.add_argument('--events', type=int, default=100, help='primary fills per scenario')
+    parser.add_argument('--burst', type=int, default=10, help='fills sent back to back before a gap')
+    parser.add_argument('--burst-gap-ms', type=float, default=0, help='pause between bursts')
+    parser.add_argument('--latency-ms', type=float, default=20.0, help='simulated broker latency per call')
+    parser.add_argument('--jitter-ms', type=float, default=5.0)
+    parser.add_argument('--error-rate', type=float, default=0.0, help='fraction of calls failing with 503')
+    parser.add_argument('--rate-limit', type=float, default=0, help='requests/s per api_key (Kite: 10); 0 = none')
+    parser.add_argument('--workers', type=int, default=16, help='REPLICATION_MAX_WORKERS')
+    parser.add_argument('--timeout', type=float, default=5.0, help='REPLICATION_ACCOUNT_TIMEOUT')
+    parser.add_argument('--retries', type=int, default=2, help='REPLICATION_MAX_RETRIES')
+    parser.add_argument('--retry-backoff', type=float, default=0.25, help='REPLICATION_RETRY_BACKOFF')
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--trace-memory', action='store_true', help='report peak Python heap (slows the run)')
+    parser.add_argument('--json', metavar='PATH', help='also write results as JSON')
+    parser.add_argument('--verbose', action='store_true', help='keep the application log on the console')
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    if not args.verbose:
+        logging.getLogger('trade_monitor').setLevel(logging.CRITICAL)
+    rows = []
+    for followers in args.followers:
+        rows.append(run_scenario(followers, args))
+        print(f"{followers} followers done", file=sys.stderr)
+    print_table(rows)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(rows, f, indent=2)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,159 @@
+"""In-process stand-ins for KiteConnect and KiteTicker backed by one simulated broker.
+
+Nothing here touches the network. Each REST call sleeps for a configurable
+latency, fails with a configurable probability, and is limited per api_key
+by a token bucket, the same way Kite answers with HTTP 429.
+"""
+import itertools
+import random
+import threading
+import time
+from datetime import datetime
+from kiteconnect.exceptions import NetworkException
+
+class FakeBroker:
+    """Order books, rate limits and websocket subscribers shared by every fake client."""
+
+    def __init__(self, latency_ms=20.0, jitter_ms=5.0, error_rate=0.0, rate_limit=10, seed=None):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        # Kite allows 10 order requests per second per api_key
+        self.rate_limit = rate_limit
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._order_ids = itertools.count(1)
+        self._orders = {}
+        self._buckets = {}
+        self._tickers = {}
+        self.calls = {'place_order': 0, 'orders': 0, 'rate_limited': 0, 'errors': 0}
+
+    def place_order(self, api_key, params):
+        self._request(api_key, 'place_order')
+        with self._lock:
+            order_id = str(next(self._order_ids))
+            order = {
+                'order_id': order_id,
+                'status': 'COMPLETE',
+                'filled_quantity': params.get('quantity'),
+                'average_price': params.get('price') or 100.0,
+                'order_timestamp': datetime.now(),
+                **params
+            }
+            self._orders.setdefault(api_key, {})[order_id] = order
+        return order_id
+
+    def orders(self, api_key):
+        self._request(api_key, 'orders')
+        with self._lock:
+            return [dict(order) for order in self._orders.get(api_key, {}).values()]
+
+    def emit(self, api_key, order):
+        """Push an order update to the tickers of api_key, as Kite does on a fill."""
+        with self._lock:
+            self._orders.setdefault(api_key, {})[order['order_id']] = dict(order)
+            tickers = list(self._tickers.get(api_key, ()))
+        for ticker in tickers:
+            ticker.on_order_update(ticker, dict(order))
+
+    def next_order_id(self):
+        with self._lock:
+            return str(next(self._order_ids))
+
+    def _attach(self, api_key, ticker):
+        with self._lock:
+            self._tickers.setdefault(api_key, []).append(ticker)
+
+    def _detach(self, api_key, ticker):
+        with self._lock:
+            if ticker in self._tickers.get(api_key, ()):
+                self._tickers[api_key].remove(ticker)
+
+    def _request(self, api_key, endpoint):
+        with self._lock:
+            self.calls[endpoint] += 1
+            limited = not self._take_token(api_key)
+            failed = not limited and self._random.random() < self.error_rate
+            delay = max(self.latency_ms + self._random.uniform(-self.jitter_ms, self.jitter_ms), 0) / 1000
+            if limited:
+                self.calls['rate_limited'] += 1
+            elif failed:
+                self.calls['errors'] += 1
+        if limited:
+            raise NetworkException("Too many requests", code=429)
+        time.sleep(delay)
+        if failed:
+            raise NetworkException("Simulated broker error", code=503)
+
+    def _take_token(self, api_key):
+        if not self.rate_limit:
+            return True
+        now = time.monotonic()
+        tokens, updated = self._buckets.get(api_key, (self.rate_limit, now))
+        tokens = min(self.rate_limit, tokens + (now - updated) * self.rate_limit)
+        if tokens < 1:
+            self._buckets[api_key] = (tokens, now)
+            return False
+        self._buckets[api_key] = (tokens - 1, now)
+        return True
+
+class FakeKiteConnect:
+    """The subset of KiteConnect that KiteService uses."""
+
+    def __init__(self, broker, api_key, pool=None, **kwargs):
+        self.broker = broker
+        self.api_key = api_key
+        self.access_token = None
+        self.reqsession = _NullSession()
+
+    def set_access_token(self, access_token):
+        self.access_token = access_token
+
+    def generate_session(self, request_token, api_secret):
+        return {'access_token': f"token-{self.api_key}"}
+
+    def place_order(self, variety, exchange, tradingsymbol, transaction_type, quantity, product, order_type,
+                    price=None, trigger_price=None, **params):
+        """Same required arguments as KiteConnect.place_order, so a call missing one fails here as it would live."""
+        return self.broker.place_order(self.api_key, dict(
+            params, variety=variety, exchange=exchange, tradingsymbol=tradingsymbol,
+            transaction_type=transaction_type, quantity=quantity, product=product, order_type=order_type,
+            price=price, trigger_price=trigger_price
+        ))
+
+    def orders(self):
+        return self.broker.orders(self.api_key)
+
+class FakeKiteTicker:
+    """The subset of KiteTicker that TickerSupervisor uses; connects instantly."""
+
+    def __init__(self, broker, api_key, access_token, **kwargs):
+        self.broker = broker
+        self.api_key = api_key
+        self.on_order_update = None
+        self.on_connect = None
+        self.on_close = None
+        self.on_error = None
+        self.on_reconnect = None
+        self.on_noreconnect = None
+
+    def connect(self, threaded=False, **kwargs):
+        self.broker._attach(self.api_key, self)
+        if self.on_connect:
+            self.on_connect(self, {})
+
+    def close(self, code=None, reason=None):
+        self.broker._detach(self.api_key, self)
+        if self.on_close:
+            self.on_close(self, code or 1000, reason or 'closed')
+
+class _NullSession:
+    def close(self):
+        pass
+
+def factories(broker):
+    """Return (kite_factory, ticker_factory) for KiteService, bound to broker."""
+    return (
+        lambda **kwargs: FakeKiteConnect(broker, **kwargs),
+        lambda api_key, access_token, **kwargs: FakeKiteTicker(broker, api_key, access_token, **kwargs)
+    )
@@ -1,3 +1,4 @@
+import sys
 from app import create_app
 from app.utils.logger import setup_logger
 
@@ -7,4 +8,10 @@ with app.app_context():
     logger = setup_logger()
 
 if __name__ == '__main__':
-    app.run(debug=True, port=5000, use_reloader=False)
\ No newline at end of file
+    if '--asgi' in sys.argv:
+        # SSE streams run on an event loop; other routes go to Flask on a worker pool
+        import uvicorn
+        from app.asgi import create_asgi_app
+        uvicorn.run(create_asgi_app(app), host='127.0.0.1', port=5000)
+    else:
+        app.run(debug=True, port=5000, use_reloader=False)